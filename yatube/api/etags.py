@@ -0,0 +1,26 @@
+import hashlib
+
+from core.shared_cache import bump_generation, get_generation
+
+VERSION_KEY = 'api:version:{}'
+
+
+def get_version(name):
+    """
+    Версия набора данных. Меняется при каждой записи, поэтому ETag
+    считается без запроса к базе. Лежит в общем кеше: запись в одном
+    воркере меняет ETag во всех.
+    """
+    return get_generation(VERSION_KEY.format(name))
+
+
+def bump_version(name):
+    bump_generation(VERSION_KEY.format(name))
+
+
+def make_etag(name, request, *parts):
+    """ETag ответа: версия данных плюс всё, от чего зависит выдача."""
+    digest = hashlib.md5(
+        '|'.join(map(str, (request.get_full_path(), *parts))).encode()
+    ).hexdigest()
+    return f'{get_version(name)}-{digest}'
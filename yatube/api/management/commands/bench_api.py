@@ -0,0 +1,87 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.serializers import (
+    POSTS, STREAM_CHUNK_SIZE, dumps, serialize_post, stream_array
+)
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость сериализации постов через экземпляры моделей '
+        'и через values_list(). Тестовые данные откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def measure(self, name, serialize, count, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            serialize()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        self.stdout.write(
+            f'{name}: {count} постов за {best * 1000:.0f} мс, '
+            f'{count / best:.0f} постов/с'
+        )
+
+    def handle(self, *args, **options):
+        count = options['posts']
+        repeat = options['repeat']
+        with transaction.atomic():
+            User.objects.bulk_create(
+                User(username=f'bench_api_{number}') for number in range(50)
+            )
+            authors = list(
+                User.objects.filter(username__startswith='bench_api_')
+            )
+            group = Group.objects.create(
+                title='Бенчмарк', slug='bench-api', description='Бенчмарк'
+            )
+            Post.objects.bulk_create(
+                (
+                    Post(
+                        text='Текст поста ' * 20,
+                        author=authors[number % len(authors)],
+                        group=group if number % 2 else None
+                    )
+                    for number in range(count)
+                ),
+                batch_size=500
+            )
+            posts = Post.objects.filter(author__in=authors).order_by(
+                '-pub_date'
+            )
+            self.measure(
+                'экземпляры моделей',
+                lambda: dumps([
+                    serialize_post(post)
+                    for post in posts.select_related('author')
+                ]),
+                count,
+                repeat
+            )
+            names = list(POSTS.fields)
+            rows = posts.values_list(*POSTS.lookups(names))
+            convert = POSTS.converter(names)
+            self.measure(
+                'values_list',
+                lambda: dumps([convert(row) for row in rows.all()]),
+                count,
+                repeat
+            )
+            self.measure(
+                'values_list потоком',
+                lambda: ''.join(stream_array(
+                    map(convert, rows.iterator(STREAM_CHUNK_SIZE))
+                )),
+                count,
+                repeat
+            )
+            transaction.set_rollback(True)
@@ -0,0 +1,45 @@
+from core.shared_cache import shared_cache
+from posts.models import Post
+
+from .serializers import serialize_post
+
+POST_KEY = 'api:post:{}'
+POST_CACHE_TIMEOUT = 60 * 60
+
+
+def get_posts(post_ids):
+    """
+    Посты по id в порядке запроса: сначала один get_many из кеша, затем
+    один in_bulk для промахов. Несуществующие и скрытые посты пропускаются.
+    Кеш общий, чтобы сброс при записи был виден всем воркерам.
+    """
+    cache = shared_cache()
+    keys = {post_id: POST_KEY.format(post_id) for post_id in post_ids}
+    cached = cache.get_many(keys.values())
+    found = {
+        post_id: cached[key]
+        for post_id, key in keys.items()
+        if key in cached
+    }
+    misses = [post_id for post_id in keys if post_id not in found]
+    if misses:
+        loaded = {
+            post_id: serialize_post(post)
+            for post_id, post in Post.objects.visible().select_related(
+                'author'
+            ).only(
+                'text', 'pub_date', 'image', 'group', 'author__username'
+            ).in_bulk(misses).items()
+        }
+        cache.set_many(
+            {keys[post_id]: data for post_id, data in loaded.items()},
+            POST_CACHE_TIMEOUT
+        )
+        found.update(loaded)
+    return [found[post_id] for post_id in post_ids if post_id in found]
+
+
+def invalidate_posts(post_ids):
+    shared_cache().delete_many(
+        [POST_KEY.format(post_id) for post_id in post_ids]
+    )
@@ -0,0 +1,108 @@
+import json
+
+from django.conf import settings
+
+STREAM_CHUNK_SIZE = 500
+
+
+def isoformat(value):
+    return value.isoformat()
+
+
+def media_url(value):
+    return settings.MEDIA_URL + value if value else None
+
+
+class ValuesSerializer:
+    """
+    Сериализует строки values_list() без создания экземпляров моделей.
+    fields: поле API -> (выражение ORM, преобразование или None).
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def select(self, requested=None):
+        """Запрошенные поля API; ValueError с неизвестными полями."""
+        if not requested:
+            return list(self.fields)
+        names = [name for name in requested.split(',') if name]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ValueError(unknown)
+        return names
+
+    def lookups(self, names):
+        return [self.fields[name][0] for name in names]
+
+    def converter(self, names):
+        """Функция, превращающая строку values_list() в словарь."""
+        converters = [
+            (index, self.fields[name][1])
+            for index, name in enumerate(names)
+            if self.fields[name][1] is not None
+        ]
+        width = len(names)
+
+        def convert(row):
+            values = list(row[:width])
+            for index, convert_value in converters:
+                if values[index] is not None:
+                    values[index] = convert_value(values[index])
+            return dict(zip(names, values))
+        return convert
+
+
+def serialize_post(post):
+    """Пост-экземпляр модели в том же виде, что и строки POSTS."""
+    return {
+        'id': post.pk,
+        'author': post.author.username,
+        'text': post.text,
+        'pub_date': isoformat(post.pub_date),
+        'image': media_url(post.image.name),
+        'group': post.group_id,
+    }
+
+
+def dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def stream_array(items, chunk_size=STREAM_CHUNK_SIZE):
+    """JSON-массив частями, не собирая весь ответ в памяти."""
+    yield '['
+    chunk = []
+    separator = ''
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            # один вызов dumps на пачку, без внешних скобок списка
+            yield separator + dumps(chunk)[1:-1]
+            separator = ','
+            chunk = []
+    if chunk:
+        yield separator + dumps(chunk)[1:-1]
+    yield ']'
+
+
+POSTS = ValuesSerializer({
+    'id': ('pk', None),
+    'author': ('author__username', None),
+    'text': ('text', None),
+    'pub_date': ('pub_date', isoformat),
+    'image': ('image', media_url),
+    'group': ('group_id', None),
+})
+
+GROUPS = ValuesSerializer({
+    'id': ('pk', None),
+    'title': ('title', None),
+    'slug': ('slug', None),
+    'description': ('description', None),
+})
+
+FOLLOWS = ValuesSerializer({
+    'user': ('user__username', None),
+    'following': ('author__username', None),
+})
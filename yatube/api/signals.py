@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from posts.follow_graph import followees_changed
+from posts.models import Group, Post
+from posts.moderation import posts_batch_changed
+
+from .etags import bump_version
+from .post_cache import invalidate_posts
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    invalidate_posts([instance.pk])
+    bump_version('posts')
+
+
+@receiver(posts_batch_changed, sender=Post)
+def posts_changed(sender, pks, **kwargs):
+    invalidate_posts(pks)
+    bump_version('posts')
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def groups_changed(sender, **kwargs):
+    bump_version('groups')
+
+
+@receiver(followees_changed)
+def follow_changed(sender, **kwargs):
+    bump_version('follow')
@@ -0,0 +1,211 @@
+import json
+from http import HTTPStatus
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.shared_cache import shared_cache
+from posts.follow_graph import follow
+from posts.models import Follow, Group, Post, User
+
+
+def stream_json(response):
+    return json.loads(b''.join(response.streaming_content))
+
+
+class ApiTestClass(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {number}', author=cls.author, group=cls.group
+            )
+            for number in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        shared_cache().clear()
+        self.user = User.objects.create_user(username='reader')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_post_list_streams_all_posts(self):
+        """Без пагинации отдаётся весь список постов потоком."""
+        response = self.client.get(reverse('api:post_list'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        posts = stream_json(response)
+        self.assertEqual(len(posts), len(self.posts))
+        self.assertEqual(posts[0]['id'], self.posts[-1].pk)
+        self.assertEqual(
+            set(posts[0]),
+            {'id', 'author', 'text', 'pub_date', 'image', 'group'}
+        )
+        self.assertEqual(posts[0]['author'], 'author')
+
+    def test_post_list_cursor_pagination(self):
+        """Курсорная пагинация проходит все посты без повторов."""
+        seen = []
+        url = reverse('api:post_list') + '?limit=2'
+        while url:
+            data = self.client.get(url).json()
+            seen.extend(post['id'] for post in data['results'])
+            url = data['next']
+        self.assertEqual(seen, [post.pk for post in reversed(self.posts)])
+
+    def test_post_list_offset_pagination(self):
+        """Пагинация limit/offset из документации API."""
+        data = self.client.get(
+            reverse('api:post_list'), {'limit': 2, 'offset': 2}
+        ).json()
+        self.assertEqual(data['count'], len(self.posts))
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNotNone(data['next'])
+        self.assertIsNotNone(data['previous'])
+
+    def test_sparse_fields(self):
+        """Параметр fields ограничивает набор полей."""
+        data = self.client.get(
+            reverse('api:post_list'), {'limit': 1, 'fields': 'id,text'}
+        ).json()
+        self.assertEqual(set(data['results'][0]), {'id', 'text'})
+        response = self.client.get(
+            reverse('api:post_list'), {'fields': 'password'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_bad_parameters(self):
+        """Неверные limit и cursor дают 400."""
+        for params in ({'limit': 0}, {'limit': 'x'}, {'cursor': '!!'}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('api:post_list'), params)
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_etag(self):
+        """Повторный запрос с ETag даёт 304, пока посты не изменились."""
+        url = reverse('api:post_detail', args=[self.posts[0].pk])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        Post.objects.create(text='Новый пост', author=self.author)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    @mock.patch.object(transaction, 'on_commit', lambda func: func())
+    def test_follow_etag_changes_after_follow(self):
+        """
+        Подписка через bulk_create меняет ETag подписок, а версия не
+        зависит от локального кеша процесса.
+        """
+        url = reverse('api:follow_list')
+        etag = self.client.get(url)['ETag']
+        cache.clear()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        follow(self.user.pk, self.author.pk)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_details(self):
+        """Пост и группа по id, 404 для несуществующих."""
+        post = self.client.get(
+            reverse('api:post_detail', args=[self.posts[0].pk])
+        ).json()
+        self.assertEqual(post['text'], self.posts[0].text)
+        self.assertEqual(post['group'], self.group.pk)
+        group = self.client.get(
+            reverse('api:group_detail', args=[self.group.pk])
+        ).json()
+        self.assertEqual(group['slug'], 'group')
+        for url in (
+            reverse('api:post_detail', args=[0]),
+            reverse('api:group_detail', args=[0]),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_group_list(self):
+        groups = stream_json(self.client.get(reverse('api:group_list')))
+        self.assertEqual(groups[0]['title'], 'Группа')
+
+    def test_follow_list(self):
+        """Подписки видны только авторизованному пользователю."""
+        Follow.objects.create(user=self.user, author=self.author)
+        follows = stream_json(
+            self.client.get(reverse('api:follow_list'), {'search': 'auth'})
+        )
+        self.assertEqual(follows, [{'user': 'reader', 'following': 'author'}])
+        response = Client().get(reverse('api:follow_list'))
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+
+class PostBatchTestClass(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.posts = [
+            Post.objects.create(text=f'Пост {number}', author=cls.author)
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        shared_cache().clear()
+
+    def get(self, *post_ids, **params):
+        return self.client.get(
+            reverse('api:post_batch'),
+            {'ids': ','.join(map(str, post_ids)), **params}
+        )
+
+    def test_batch_preserves_order(self):
+        """Посты возвращаются в порядке запроса, неизвестные пропущены."""
+        first, second, third = self.posts
+        data = self.get(third.pk, 0, first.pk, third.pk).json()
+        self.assertEqual(
+            [post['id'] for post in data['results']], [third.pk, first.pk]
+        )
+
+    def test_batch_served_from_cache(self):
+        """Повторный запрос обходится без запросов к базе."""
+        post_ids = [post.pk for post in self.posts]
+        self.get(*post_ids)
+        with self.assertNumQueries(0):
+            data = self.get(*post_ids, fields='text').json()
+        self.assertEqual(data['results'][0], {'text': 'Пост 0'})
+
+    def test_batch_cache_invalidated(self):
+        """Изменённый пост перечитывается из базы."""
+        post = Post.objects.get(pk=self.posts[0].pk)
+        self.get(post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        data = self.get(post.pk).json()
+        self.assertEqual(data['results'][0]['text'], 'Новый текст')
+
+    def test_batch_cache_shared(self):
+        """Посты кешируются в общем кеше, а не в кеше процесса."""
+        post_ids = [post.pk for post in self.posts]
+        self.get(*post_ids)
+        cache.clear()
+        with self.assertNumQueries(0):
+            self.get(*post_ids)
+
+    def test_batch_bad_ids(self):
+        for ids in ('', 'x', ','.join(map(str, range(1, 302)))):
+            with self.subTest(ids=ids[:10]):
+                response = self.client.get(
+                    reverse('api:post_batch'), {'ids': ids}
+                )
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
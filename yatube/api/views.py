@@ -0,0 +1,218 @@
+from http import HTTPStatus
+
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import condition, require_safe
+
+from posts.models import Follow, Group, Post
+from posts.pagination import decode_cursor, make_cursor
+
+from .etags import make_etag
+from .post_cache import get_posts
+from .serializers import (
+    FOLLOWS, GROUPS, POSTS, STREAM_CHUNK_SIZE, stream_array
+)
+
+DEFAULT_LIMIT = 100
+MAX_BATCH_IDS = 300
+MAX_LIMIT = 1000
+NOT_FOUND = {'detail': 'Страница не найдена.'}
+NOT_AUTHENTICATED = {'detail': 'Учетные данные не были предоставлены.'}
+
+
+def json_response(data, status=HTTPStatus.OK):
+    return JsonResponse(
+        data,
+        status=status,
+        safe=False,
+        json_dumps_params={'ensure_ascii': False}
+    )
+
+
+def streaming_response(rows, convert):
+    """Весь список потоком, читая базу частями через iterator()."""
+    return StreamingHttpResponse(
+        stream_array(map(convert, rows.iterator(STREAM_CHUNK_SIZE))),
+        content_type='application/json'
+    )
+
+
+def page_url(request, **params):
+    query = request.GET.copy()
+    for name, value in params.items():
+        query.pop(name, None)
+        if value is not None:
+            query[name] = value
+    return request.build_absolute_uri('?' + query.urlencode())
+
+
+def parse_number(request, name, maximum=None):
+    value = request.GET.get(name)
+    if value is None:
+        return None
+    if not value.isdigit() or (maximum and not 0 < int(value) <= maximum):
+        raise ValueError({name: ['Недопустимое значение.']})
+    return int(value)
+
+
+def parse_fields(request, serializer):
+    """Запрошенные в fields поля; ValueError с ошибками."""
+    try:
+        return serializer.select(request.GET.get('fields'))
+    except ValueError as error:
+        raise ValueError({
+            'fields': [f'Неизвестные поля: {", ".join(error.args[0])}.']
+        })
+
+
+def parse_ids(request):
+    """Уникальные id из ?ids= в исходном порядке; ValueError с ошибками."""
+    post_ids = [
+        post_id for post_id in request.GET.get('ids', '').split(',') if post_id
+    ]
+    if not all(post_id.isdigit() for post_id in post_ids):
+        raise ValueError({'ids': ['Недопустимое значение.']})
+    post_ids = list(dict.fromkeys(map(int, post_ids)))
+    if not 0 < len(post_ids) <= MAX_BATCH_IDS:
+        raise ValueError({'ids': [f'Нужно от 1 до {MAX_BATCH_IDS} id.']})
+    return post_ids
+
+
+def parse_query(request, serializer):
+    """Поля, limit, offset и курсор из запроса; ValueError с ошибками."""
+    names = parse_fields(request, serializer)
+    limit = parse_number(request, 'limit', MAX_LIMIT)
+    offset = parse_number(request, 'offset')
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            cursor = decode_cursor(cursor)
+        except ValueError:
+            raise ValueError({'cursor': ['Недопустимый курсор.']})
+    return names, limit, offset, cursor
+
+
+def posts_etag(request, *args, **kwargs):
+    return make_etag('posts', request)
+
+
+def groups_etag(request, *args, **kwargs):
+    return make_etag('groups', request)
+
+
+def follow_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    return make_etag('follow', request, request.user.pk)
+
+
+@require_safe
+@condition(etag_func=posts_etag)
+def post_list(request):
+    """
+    Без limit, offset и cursor отдаёт весь список потоком, с ними —
+    страницу с курсором по индексу (pub_date, id) или, для
+    совместимости, по смещению.
+    """
+    try:
+        names, limit, offset, cursor = parse_query(request, POSTS)
+    except ValueError as error:
+        return json_response(error.args[0], HTTPStatus.BAD_REQUEST)
+    posts = Post.objects.visible().order_by('-pub_date', '-pk').values_list(
+        *POSTS.lookups(names), 'pub_date', 'pk'
+    )
+    convert = POSTS.converter(names)
+    if limit is None and offset is None and cursor is None:
+        return streaming_response(posts, convert)
+    limit = limit or DEFAULT_LIMIT
+    if offset is not None:
+        count = posts.count()
+        rows = posts[offset:offset + limit]
+        return json_response({
+            'count': count,
+            'next': page_url(request, offset=offset + limit)
+            if offset + limit < count else None,
+            'previous': page_url(request, offset=max(offset - limit, 0))
+            if offset else None,
+            'results': [convert(row) for row in rows],
+        })
+    if cursor is not None:
+        pub_date, pk = cursor
+        posts = posts.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+        )
+    rows = list(posts[:limit + 1])
+    next_url = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_url = page_url(request, cursor=make_cursor(*rows[-1][-2:]))
+    return json_response({
+        'next': next_url,
+        'results': [convert(row) for row in rows],
+    })
+
+
+@require_safe
+@condition(etag_func=posts_etag)
+def post_detail(request, post_id):
+    names = list(POSTS.fields)
+    rows = Post.objects.visible().filter(pk=post_id).values_list(
+        *POSTS.lookups(names)
+    )[:1]
+    if not rows:
+        return json_response(NOT_FOUND, HTTPStatus.NOT_FOUND)
+    return json_response(POSTS.converter(names)(rows[0]))
+
+
+@require_safe
+@condition(etag_func=posts_etag)
+def post_batch(request):
+    """Несколько постов по ?ids=1,2,3 одним ответом в порядке запроса."""
+    try:
+        names = parse_fields(request, POSTS)
+        post_ids = parse_ids(request)
+    except ValueError as error:
+        return json_response(error.args[0], HTTPStatus.BAD_REQUEST)
+    posts = get_posts(post_ids)
+    if len(names) < len(POSTS.fields):
+        posts = [{name: post[name] for name in names} for post in posts]
+    return json_response({'results': posts})
+
+
+@require_safe
+@condition(etag_func=groups_etag)
+def group_list(request):
+    try:
+        names = parse_fields(request, GROUPS)
+    except ValueError as error:
+        return json_response(error.args[0], HTTPStatus.BAD_REQUEST)
+    groups = Group.objects.order_by('pk').values_list(*GROUPS.lookups(names))
+    return streaming_response(groups, GROUPS.converter(names))
+
+
+@require_safe
+@condition(etag_func=groups_etag)
+def group_detail(request, group_id):
+    names = list(GROUPS.fields)
+    rows = Group.objects.filter(pk=group_id).values_list(
+        *GROUPS.lookups(names)
+    )[:1]
+    if not rows:
+        return json_response(NOT_FOUND, HTTPStatus.NOT_FOUND)
+    return json_response(GROUPS.converter(names)(rows[0]))
+
+
+@require_safe
+@condition(etag_func=follow_etag)
+def follow_list(request):
+    if not request.user.is_authenticated:
+        return json_response(NOT_AUTHENTICATED, HTTPStatus.UNAUTHORIZED)
+    names = list(FOLLOWS.fields)
+    follows = Follow.objects.filter(user=request.user)
+    search = request.GET.get('search')
+    if search:
+        follows = follows.filter(author__username__icontains=search)
+    follows = follows.order_by('author__username').values_list(
+        *FOLLOWS.lookups(names)
+    )
+    return streaming_response(follows, FOLLOWS.converter(names))
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+
+from core.shared_cache import shared_cache
+
+USER_CACHE_KEY = 'auth:user:{}'
+
+
+def forget_user(user_id):
+    """Убирает пользователя из кеша после изменения его данных."""
+    shared_cache().delete(USER_CACHE_KEY.format(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend, который берёт пользователя сессии из кеша, а не
+    запросом к auth_user на каждый запрос. Смену пароля по-прежнему
+    проверяет хеш в сессии: сохранение пользователя сбрасывает кеш.
+    Кеш shared должен быть общим для воркеров, см. core.checks.
+    """
+
+    def get_user(self, user_id):
+        cache = shared_cache()
+        key = USER_CACHE_KEY.format(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
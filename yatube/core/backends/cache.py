@@ -0,0 +1,19 @@
+from django.core.cache.backends.locmem import LocMemCache
+
+from core.instrumentation import current_stats
+
+_MISSING = object()
+
+
+class InstrumentedLocMemCache(LocMemCache):
+    """LocMemCache, учитывающий попадания и промахи в статистике запроса."""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        stats = current_stats()
+        if stats is not None:
+            if value is _MISSING:
+                stats.cache_misses += 1
+            else:
+                stats.cache_hits += 1
+        return default if value is _MISSING else value
@@ -0,0 +1,55 @@
+from django.db.backends.sqlite3 import base
+
+# прагмы для каждого нового соединения; переопределяются ключом PRAGMAS
+DEFAULT_PRAGMAS = {
+    # читатели не блокируют писателя и наоборот
+    'journal_mode': 'WAL',
+    # ждать освобождения блокировки, а не падать с «database is locked»
+    'busy_timeout': 5000,
+    # в режиме WAL fsync при checkpoint достаточен для целостности
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # отрицательное значение — размер в КиБ
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite для нескольких воркеров: WAL, ожидание блокировок и
+    транзакции, сразу захватывающие блокировку на запись.
+    """
+
+    @property
+    def pragmas(self):
+        return {**DEFAULT_PRAGMAS, **self.settings_dict.get('PRAGMAS', {})}
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    @property
+    def checks_foreign_keys(self):
+        return self.pragmas.get('foreign_keys') != 'OFF'
+
+    def enable_constraint_checking(self):
+        # после миграций не включать внешние ключи, отключённые в PRAGMAS
+        if self.checks_foreign_keys:
+            super().enable_constraint_checking()
+
+    def check_constraints(self, table_names=None):
+        if self.checks_foreign_keys:
+            super().check_constraints(table_names)
+
+    def _start_transaction_under_autocommit(self):
+        """
+        BEGIN IMMEDIATE вместо отложенного BEGIN: транзакция, которая
+        сначала читает, а потом пишет, иначе получает SQLITE_BUSY без
+        ожидания busy_timeout. Поэтому только читающий код не открывает
+        atomic(): в режиме autocommit он не ждёт писателей.
+        """
+        mode = self.settings_dict.get('TRANSACTION_MODE', 'IMMEDIATE')
+        self.cursor().execute(f'BEGIN {mode}')
@@ -0,0 +1,29 @@
+import time
+
+from django.template.backends.django import DjangoTemplates, Template
+
+from core.instrumentation import current_stats
+
+
+class InstrumentedTemplate(Template):
+    """Шаблон, учитывающий время рендеринга в статистике запроса."""
+
+    def render(self, context=None, request=None):
+        stats = current_stats()
+        if stats is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_time += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return InstrumentedTemplate(template.template, self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
@@ -0,0 +1,108 @@
+"""
+Заполнение данных больших таблиц пачками по первичному ключу.
+
+Каждая пачка обрабатывается в своей транзакции вместе с сохранением
+контрольной точки, поэтому прерванное заполнение продолжается с места
+остановки, а писатели сайта не ждут одну длинную транзакцию.
+
+    @register
+    class PostExcerpt(Backfill):
+        name = 'post_excerpt'
+
+        def get_queryset(self):
+            return self.apps.get_model('posts', 'Post').objects.filter(
+                excerpt=''
+            )
+
+        def process(self, chunk):
+            for post in chunk:
+                ...
+
+Запуск: manage.py backfill post_excerpt или из миграции с atomic = False
+операцией backfill_operation(PostExcerpt).
+"""
+import logging
+import time
+
+from django.apps import apps as global_apps
+from django.db import migrations, transaction
+
+BACKFILL_BATCH_SIZE = 1000
+BACKFILL_PAUSE = 0.1
+
+logger = logging.getLogger('yatube.backfill')
+
+backfills = {}
+
+
+def register(backfill_class):
+    """Делает заполнение доступным для manage.py backfill."""
+    backfills[backfill_class.name] = backfill_class
+    return backfill_class
+
+
+class Backfill:
+    name = None
+    batch_size = BACKFILL_BATCH_SIZE
+    pause = BACKFILL_PAUSE
+
+    def __init__(self, apps=None):
+        # в миграциях — исторические модели
+        self.apps = apps or global_apps
+
+    def get_queryset(self):
+        """Строки, которые нужно обработать."""
+        raise NotImplementedError
+
+    def process(self, chunk):
+        """Обрабатывает пачку: queryset строк с id из пачки."""
+        raise NotImplementedError
+
+
+def run_backfill(backfill, batch_size=None, pause=None, restart=False):
+    """
+    Обрабатывает строки пачками по возрастанию id, сохраняя контрольную
+    точку после каждой пачки. Возвращает контрольную точку.
+    """
+    checkpoints = backfill.apps.get_model('core', 'BackfillCheckpoint')
+    batch_size = batch_size or backfill.batch_size
+    pause = backfill.pause if pause is None else pause
+    checkpoint, _ = checkpoints.objects.get_or_create(name=backfill.name)
+    if restart:
+        checkpoint.last_pk = checkpoint.processed = 0
+        checkpoint.done = False
+    elif checkpoint.done:
+        return checkpoint
+    queryset = backfill.get_queryset().order_by('pk')
+    model = queryset.model
+    while True:
+        pks = list(queryset.filter(pk__gt=checkpoint.last_pk).values_list(
+            'pk', flat=True
+        )[:batch_size])
+        if not pks:
+            break
+        with transaction.atomic():
+            backfill.process(model._default_manager.filter(pk__in=pks))
+            checkpoint.last_pk = pks[-1]
+            checkpoint.processed += len(pks)
+            checkpoint.save()
+        logger.info(
+            '%s: обработано %d, последний id %d',
+            backfill.name, checkpoint.processed, checkpoint.last_pk
+        )
+        time.sleep(pause)
+    checkpoint.done = True
+    checkpoint.save()
+    return checkpoint
+
+
+def backfill_operation(backfill_class):
+    """
+    Операция миграции, запускающая заполнение на исторических моделях.
+    В миграции нужно указать atomic = False, иначе все пачки окажутся
+    в одной транзакции миграции.
+    """
+    def forwards(apps, schema_editor):
+        run_backfill(backfill_class(apps))
+
+    return migrations.RunPython(forwards, migrations.RunPython.noop)
@@ -0,0 +1,105 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+BACKUP_PAGES = 256
+BACKUP_PAUSE = 0.01
+# столько раз backup API может начать копирование заново из-за записей
+# в источник, прежде чем копия снимается через VACUUM INTO
+BACKUP_MAX_RESTARTS = 3
+
+
+class BackupRestarted(Exception):
+    """Источник менялся быстрее, чем backup API успевал его скопировать."""
+
+
+def connect(name):
+    # тестовая база в памяти задаётся URI
+    return sqlite3.connect(name, uri=name.startswith('file:'))
+
+
+def backup_database(name, target, pages=BACKUP_PAGES, pause=BACKUP_PAUSE,
+                    max_restarts=BACKUP_MAX_RESTARTS):
+    """
+    Онлайн-копия SQLite через backup API по pages страниц за шаг.
+    Возвращает способ копирования: 'backup' или 'vacuum'.
+
+    Между шагами блокировка источника отпускается и процесс спит pause
+    секунд, так что запросы сайта не ждут окончания копирования. Если
+    источник изменился во время копирования, SQLite начинает заново;
+    после max_restarts таких перезапусков копия снимается одним
+    VACUUM INTO: он читает согласованный снимок в одной транзакции.
+    """
+    restarts = 0
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal restarts, last_remaining
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > max_restarts:
+                raise BackupRestarted(restarts)
+        last_remaining = remaining
+        time.sleep(pause)
+
+    source = connect(name)
+    try:
+        destination = sqlite3.connect(target)
+        try:
+            with destination:
+                source.backup(destination, pages=pages, progress=progress)
+            return 'backup'
+        except BackupRestarted:
+            pass
+        finally:
+            destination.close()
+        # VACUUM INTO пишет только в несуществующий файл
+        os.remove(target)
+        source.execute('VACUUM INTO ?', (target,))
+        return 'vacuum'
+    finally:
+        source.close()
+
+
+def compress(path):
+    """Сжимает файл в path.gz и удаляет исходный."""
+    with open(path, 'rb') as source, gzip.open(f'{path}.gz', 'wb') as target:
+        shutil.copyfileobj(source, target)
+    os.remove(path)
+    return f'{path}.gz'
+
+
+def verify(path, name):
+    """
+    Восстанавливает копию во временный файл и проверяет её целостность
+    и применённые миграции. Возвращает список проблем.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        restored = os.path.join(directory, 'restored.sqlite3')
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rb') as source, open(restored, 'wb') as target:
+            shutil.copyfileobj(source, target)
+        backup = sqlite3.connect(restored)
+        try:
+            problems = [
+                row[0]
+                for row in backup.execute('PRAGMA integrity_check')
+                if row[0] != 'ok'
+            ]
+            query = 'SELECT app, name FROM django_migrations'
+            source = connect(name)
+            try:
+                missing = set(source.execute(query)) - set(
+                    backup.execute(query)
+                )
+            finally:
+                source.close()
+        finally:
+            backup.close()
+    problems.extend(
+        f'нет миграции {app}.{migration}' for app, migration in missing
+    )
+    return problems
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+from .shared_cache import SHARED_CACHE
+
+CACHED_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+CACHED_AUTH_BACKEND = 'core.backends.auth.CachedModelBackend'
+
+
+def is_process_local(alias):
+    """Кеш, который у каждого процесса свой или которого нет вовсе."""
+    return isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+@register(Tags.security)
+def check_session_caches(app_configs, **kwargs):
+    """
+    Сессии и пользователь сессии в кеше процесса: выход, смена пароля
+    и блокировка в одном воркере не видны остальным, и старая сессия
+    продолжает в них работать.
+    """
+    errors = []
+    if (
+        settings.SESSION_ENGINE in CACHED_SESSION_ENGINES
+        and is_process_local(settings.SESSION_CACHE_ALIAS)
+    ):
+        errors.append(Error(
+            f'{settings.SESSION_ENGINE} хранит сессии в кеше '
+            f'{settings.SESSION_CACHE_ALIAS!r}, который не общий для '
+            f'процессов.',
+            hint='Укажите в SESSION_CACHE_ALIAS memcached или верните '
+                 'django.contrib.sessions.backends.db.',
+            id='core.E001',
+        ))
+    if (
+        CACHED_AUTH_BACKEND in settings.AUTHENTICATION_BACKENDS
+        and is_process_local(SHARED_CACHE)
+    ):
+        errors.append(Error(
+            f'{CACHED_AUTH_BACKEND} хранит пользователей в кеше '
+            f'{SHARED_CACHE!r}, который не общий для процессов.',
+            hint='Укажите для кеша shared memcached или используйте '
+                 'django.contrib.auth.backends.ModelBackend.',
+            id='core.E002',
+        ))
+    return errors
@@ -0,0 +1,40 @@
+import re
+
+from django.utils.safestring import mark_safe
+
+MARKER_PREFIX = '<!--user-fragment:'
+MARKER_RE = re.compile(rb'<!--user-fragment:([^>]*?)-->')
+
+renderers = {}
+
+
+def register(name):
+    """
+    Регистрирует функцию render(request, *args), возвращающую HTML
+    фрагмента для текущего пользователя.
+    """
+    def decorator(render):
+        renderers[name] = render
+        return render
+    return decorator
+
+
+def marker(name, *args):
+    """
+    Метка фрагмента в общем для всех HTML. Метка не зависит от
+    пользователя, поэтому страницу с ней можно кешировать один раз.
+    """
+    return mark_safe(MARKER_PREFIX + ':'.join(map(str, (name, *args))) + '-->')
+
+
+def stitch(request, content):
+    """Заменяет метки фрагментов в content на HTML для request.user."""
+    if MARKER_PREFIX.encode() not in content:
+        return content
+
+    def replace(match):
+        name, *args = match.group(1).decode().split(':')
+        render = renderers.get(name)
+        return render(request, *args).encode() if render else b''
+
+    return MARKER_RE.sub(replace, content)
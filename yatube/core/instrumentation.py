@@ -0,0 +1,55 @@
+import contextvars
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+_current_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    """Счётчики SQL-запросов, рендеринга шаблонов и кеша одного запроса."""
+
+    def __init__(self):
+        self.queries = []
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def query_count(self):
+        return len(self.queries)
+
+    def top_queries(self, limit=5):
+        """Самые долгие запросы в виде списка пар (sql, длительность)."""
+        return sorted(self.queries, key=lambda query: query[1],
+                      reverse=True)[:limit]
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.queries.append((sql, duration))
+            self.sql_time += duration
+
+
+def current_stats():
+    """Статистика текущего запроса или None, если сбор не включён."""
+    return _current_stats.get()
+
+
+@contextmanager
+def collect_stats():
+    """Собирает статистику по всем подключениям к БД внутри блока."""
+    stats = RequestStats()
+    token = _current_stats.set(stats)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            yield stats
+    finally:
+        _current_stats.reset(token)
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import autodiscover_modules
+
+from core.backfill import backfills, run_backfill
+from core.models import BackfillCheckpoint
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает зарегистрированное заполнение данных пачками с '
+        'продолжением с контрольной точки. Без имени — список заполнений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', nargs='?')
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument('--pause', type=float)
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Начать сначала, забыв контрольную точку'
+        )
+
+    def handle(self, *args, **options):
+        # заполнения объявляются в модулях backfills приложений
+        autodiscover_modules('backfills')
+        name = options['name']
+        if name is None:
+            checkpoints = BackfillCheckpoint.objects.in_bulk(list(backfills))
+            for name in sorted(backfills):
+                checkpoint = checkpoints.get(name)
+                status = 'не запускалось'
+                if checkpoint:
+                    status = 'завершено' if checkpoint.done else (
+                        f'остановлено на id {checkpoint.last_pk}'
+                    )
+                self.stdout.write(f'{name}: {status}')
+            return
+        if name not in backfills:
+            raise CommandError(f'Неизвестное заполнение {name}')
+        checkpoint = run_backfill(
+            backfills[name](),
+            options['batch_size'],
+            options['pause'],
+            options['restart']
+        )
+        self.stdout.write(f'{name}: обработано строк {checkpoint.processed}')
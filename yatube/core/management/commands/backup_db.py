@@ -0,0 +1,54 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from core.backup import (
+    BACKUP_PAGES, BACKUP_PAUSE, backup_database, compress, verify
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Онлайн-копия базы SQLite небольшими шагами, не блокирующая '
+        'запись, с необязательным сжатием и проверкой восстановления.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--output', help='Файл копии, по умолчанию в BACKUP_DIR'
+        )
+        parser.add_argument('--pages', type=int, default=BACKUP_PAGES)
+        parser.add_argument('--pause', type=float, default=BACKUP_PAUSE)
+        parser.add_argument('--compress', action='store_true')
+        parser.add_argument('--verify', action='store_true')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f'База {alias} не SQLite')
+        name = connection.settings_dict['NAME']
+        path = options['output']
+        if not path:
+            os.makedirs(settings.BACKUP_DIR, exist_ok=True)
+            path = os.path.join(
+                settings.BACKUP_DIR,
+                f'{alias}-{timezone.now():%Y%m%d-%H%M%S}.sqlite3'
+            )
+        method = backup_database(
+            name, path, options['pages'], options['pause']
+        )
+        if options['compress']:
+            path = compress(path)
+        self.stdout.write(f'Копия {alias} ({method}): {path}')
+        if options['verify']:
+            problems = verify(path, name)
+            if problems:
+                raise CommandError(
+                    'Копия не прошла проверку: ' + '; '.join(problems)
+                )
+            self.stdout.write('Проверка восстановления пройдена')
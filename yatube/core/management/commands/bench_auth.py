@@ -0,0 +1,93 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.shared_cache import SHARED_CACHE, shared_cache
+from posts.models import Group, Post, User
+
+CONFIGURATIONS = {
+    'сессии и пользователь из базы': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'AUTHENTICATION_BACKENDS': [
+            'django.contrib.auth.backends.ModelBackend',
+        ],
+    },
+    # в prod только с memcached, см. core.checks
+    'сессии и пользователь из кеша': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+        'AUTHENTICATION_BACKENDS': [
+            'core.backends.auth.CachedModelBackend',
+            'django.contrib.auth.backends.ModelBackend',
+        ],
+    },
+}
+# свои кеши в памяти процесса: с настройками prod сброс кешей перед
+# прогоном не должен задеть кеши сайта
+BENCH_CACHES = {
+    alias: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': f'bench-auth-{alias}',
+    }
+    for alias in ('default', SHARED_CACHE)
+}
+
+
+def is_auth_query(sql):
+    """Запрос сессии или пользователя сессии, а не запрос самой view."""
+    return 'django_session' in sql or (
+        'FROM "auth_user" WHERE "auth_user"."id" =' in sql
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Считает запросы к базе на просмотр страниц авторизованным '
+        'пользователем с сессиями и пользователем из базы и из кеша. '
+        'Тестовые данные откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = User.objects.create_user(username='bench_auth')
+            group = Group.objects.create(
+                title='Бенчмарк', slug='bench-auth', description='Бенчмарк'
+            )
+            Post.objects.create(text='Текст', author=user, group=group)
+            urls = [
+                reverse('posts:index'),
+                reverse('posts:group_list', args=[group.slug]),
+                reverse('posts:profile', args=[user.username]),
+            ]
+            for name, overrides in CONFIGURATIONS.items():
+                with override_settings(CACHES=BENCH_CACHES, **overrides):
+                    cache.clear()
+                    shared_cache().clear()
+                    client = Client()
+                    client.force_login(user)
+                    self.stdout.write(name)
+                    for url in urls:
+                        # первый запрос прогревает кеши
+                        client.get(url)
+                        total = auth = 0
+                        for _ in range(options['repeat']):
+                            with CaptureQueriesContext(connection) as context:
+                                client.get(url)
+                            total += len(context)
+                            auth += sum(
+                                is_auth_query(query['sql'])
+                                for query in context
+                            )
+                        self.stdout.write(
+                            f'  {url}: {total / options["repeat"]:.1f} '
+                            f'запросов, из них сессия и пользователь '
+                            f'{auth / options["repeat"]:.1f}'
+                        )
+                    cache.clear()
+                    shared_cache().clear()
+            transaction.set_rollback(True)
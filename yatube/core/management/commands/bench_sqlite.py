@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper as PlainWrapper
+
+from core.backends.sqlite3.base import DatabaseWrapper as TunedWrapper
+
+VARIANTS = {
+    'django.db.backends.sqlite3': PlainWrapper,
+    'core.backends.sqlite3': TunedWrapper,
+}
+
+
+def open_connection(wrapper_class, path):
+    return wrapper_class({
+        'NAME': path,
+        'OPTIONS': {},
+        'TIME_ZONE': None,
+        'AUTOCOMMIT': True,
+        'ATOMIC_REQUESTS': False,
+        'CONN_MAX_AGE': None,
+        'USER': '',
+        'PASSWORD': '',
+        'HOST': '',
+        'PORT': '',
+        'TEST': {},
+    })
+
+
+def writer(args):
+    """
+    Транзакции «прочитать, затем записать», как при добавлении
+    комментария; возвращает число успешных записей и ошибок блокировки.
+    """
+    wrapper_class, path, seconds = args
+    connection = open_connection(wrapper_class, path)
+    written = locked = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        connection.set_autocommit(
+            False, force_begin_transaction_with_broken_autocommit=True
+        )
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT COUNT(*) FROM bench')
+                cursor.execute(
+                    'INSERT INTO bench (value) VALUES (%s)', [os.getpid()]
+                )
+            connection.commit()
+            written += 1
+        except OperationalError:
+            connection.rollback()
+            locked += 1
+        finally:
+            connection.set_autocommit(True)
+    connection.close()
+    return written, locked
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает число записей в секунду и ошибок «database is locked» '
+        'при конкурентной записи из нескольких процессов для стандартного '
+        'и настроенного бэкенда SQLite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=3)
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        seconds = options['seconds']
+        connections.close_all()
+        with tempfile.TemporaryDirectory() as directory:
+            for name, wrapper_class in VARIANTS.items():
+                path = os.path.join(
+                    directory, f'{wrapper_class.__module__}.db'
+                )
+                with sqlite3.connect(path) as conn:
+                    conn.execute(
+                        'CREATE TABLE bench '
+                        '(id INTEGER PRIMARY KEY, value TEXT)'
+                    )
+                with multiprocessing.Pool(processes) as pool:
+                    results = pool.map(
+                        writer, [(wrapper_class, path, seconds)] * processes
+                    )
+                written = sum(result[0] for result in results)
+                locked = sum(result[1] for result in results)
+                self.stdout.write(
+                    f'{name}: {written / seconds:.0f} записей/с, '
+                    f'ошибок блокировки: {locked}'
+                )
@@ -0,0 +1,82 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+PROFILES = ('dev', 'prod')
+
+# импорт WSGI-приложения и первый запрос в свежем процессе
+WSGI_SCRIPT = '''
+import json
+import time
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+from yatube.wsgi import application
+imported = time.perf_counter()
+environ = {'PATH_INFO': '/'}
+setup_testing_defaults(environ)
+status = []
+body = b''.join(
+    application(environ, lambda code, headers: status.append(code))
+)
+served = time.perf_counter()
+print(json.dumps({
+    'import': imported - started,
+    'first_request': served - imported,
+    'status': status[0],
+}))
+'''
+
+
+def median(values):
+    return statistics.median(values) * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время запуска профилей настроек в свежих процессах: '
+        'manage.py check целиком, импорт WSGI-приложения и первый запрос '
+        'к главной странице.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--profiles', nargs='+', default=PROFILES)
+
+    def run(self, profile, *args):
+        env = dict(os.environ, DJANGO_ENV=profile)
+        # prod не читает .env, ключ передаётся через окружение
+        env.setdefault('SECRET_KEY', settings.SECRET_KEY)
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, *args],
+            cwd=settings.BASE_DIR,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        return time.perf_counter() - started, output
+
+    def handle(self, *args, **options):
+        for profile in options['profiles']:
+            manage = []
+            imports = []
+            first_requests = []
+            for _ in range(options['runs']):
+                manage.append(self.run(profile, 'manage.py', 'check')[0])
+                result = json.loads(self.run(profile, '-c', WSGI_SCRIPT)[1])
+                imports.append(result['import'])
+                first_requests.append(result['first_request'])
+            self.stdout.write(
+                f'{profile}: manage.py check {median(manage):.0f} мс, '
+                f'импорт WSGI {median(imports):.0f} мс, '
+                f'первый запрос {median(first_requests):.0f} мс '
+                f'({result["status"]})'
+            )
@@ -0,0 +1,71 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+
+from core.write_queue import WriteQueue
+from posts.models import Comment, Post, User
+from posts.views import save_comment
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает число комментариев в секунду при прямой записи из '
+        'многих потоков и через очередь единственного писателя. '
+        'Созданные данные удаляются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=50)
+        parser.add_argument('--comments', type=int, default=40)
+
+    def run_writers(self, write, writers, comments):
+        errors = []
+
+        def worker():
+            try:
+                for number in range(comments):
+                    try:
+                        write(Comment(
+                            text=f'Комментарий {number}',
+                            author=self.author,
+                            post=self.post
+                        ))
+                    except OperationalError:
+                        errors.append(number)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(writers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start, len(errors)
+
+    def handle(self, *args, **options):
+        writers = options['writers']
+        comments = options['comments']
+        self.author = User.objects.create_user(username='bench_write_queue')
+        self.post = Post.objects.create(text='Бенчмарк', author=self.author)
+        writer = WriteQueue()
+
+        def direct(comment):
+            with transaction.atomic():
+                save_comment(comment)
+
+        def queued(comment):
+            writer.submit(save_comment, comment).result()
+
+        try:
+            for name, write in (('напрямую', direct), ('очередь', queued)):
+                elapsed, errors = self.run_writers(write, writers, comments)
+                self.stdout.write(
+                    f'{name}: {writers * comments / elapsed:.0f} '
+                    f'комментариев/с, ошибок блокировки: {errors}'
+                )
+        finally:
+            self.post.delete()
+            self.author.delete()
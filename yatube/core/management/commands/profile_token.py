@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.middleware.profiling import make_profile_token
+
+
+class Command(BaseCommand):
+    help = (
+        'Выдаёт одноразовое значение заголовка X-Profile для профилирования '
+        'одного запроса к указанному пути.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='путь запроса, например /group/cats/')
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_profile_token(options['path']))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.warmup import WARMUP_PAGES_LIMIT, warm_caches
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает шаблоны и URL-резолверы и рендерит первые страницы '
+        'главной, активных групп и популярных профилей в кеш страниц '
+        'PAGE_CACHE_ALIAS, общий для воркеров в prod.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=WARMUP_PAGES_LIMIT,
+            help='сколько групп и профилей прогревать'
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for step, count, seconds in warm_caches(options['limit']):
+            total += seconds
+            self.stdout.write(f'{step}: {count} за {seconds:.3f} с')
+        self.stdout.write(f'Всего: {total:.3f} с')
@@ -0,0 +1,224 @@
+import atexit
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# файл не обновлялся столько интервалов сброса — его процесс завершился
+STALE_FLUSH_INTERVALS = 10
+RETIRED_FILE = 'metrics-retired.json'
+
+
+class MetricsRegistry:
+    """
+    Метрики запросов процесса в разрезе имён URL.
+
+    Каждый процесс периодически сбрасывает свои счётчики в отдельный файл
+    общего каталога, а при выдаче метрик файлы всех процессов суммируются.
+    Файлы завершившихся процессов сливаются в общий файл и удаляются.
+    """
+
+    def __init__(self, directory=None, flush_interval=None):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.last_flush = 0.0
+        self.pid = None
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.views = defaultdict(self._empty_view)
+
+    @staticmethod
+    def _empty_view():
+        return {
+            'statuses': defaultdict(int),
+            'buckets': [0] * len(LATENCY_BUCKETS),
+            'count': 0,
+            'sum': 0.0,
+            'queries': 0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+        }
+
+    def observe(self, view, status, duration, stats):
+        with self.lock:
+            data = self.views[view]
+            data['statuses'][str(status)] += 1
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    data['buckets'][index] += 1
+            data['count'] += 1
+            data['sum'] += duration
+            data['queries'] += stats.query_count
+            data['cache_hits'] += stats.cache_hits
+            data['cache_misses'] += stats.cache_misses
+        self.start_flusher()
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def start_flusher(self):
+        """
+        Запускает в процессе поток, сбрасывающий счётчики по таймеру:
+        иначе последние запросы простаивающего воркера не попадут в файл.
+        """
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            if self.pid is not None:
+                # после fork счётчики родителя уже учтены в его файле
+                self.views = defaultdict(self._empty_view)
+            self.pid = os.getpid()
+            # pid может достаться новому процессу, имя файла уникально
+            self.token = uuid.uuid4().hex[:8]
+        if self.directory and self.flush_interval:
+            threading.Thread(target=self.flush_forever, daemon=True).start()
+            atexit.register(self.flush)
+
+    def flush_forever(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    @property
+    def path(self):
+        self.start_flusher()
+        return os.path.join(
+            self.directory, f'metrics-{self.pid}-{self.token}.json'
+        )
+
+    def flush(self):
+        """Атомарно записывает счётчики процесса в его файл."""
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with self.lock:
+            payload = json.dumps(self.views)
+            self.last_flush = time.monotonic()
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as file:
+            file.write(payload)
+        os.replace(tmp_path, self.path)
+
+    def collect(self):
+        """Суммирует счётчики всех процессов."""
+        if not self.directory:
+            with self.lock:
+                return json.loads(json.dumps(self.views))
+        self.flush()
+        self.retire_stale()
+        merged = defaultdict(self._empty_view)
+        for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+            self.merge(merged, self.load(path))
+        return merged
+
+    @staticmethod
+    def load(path):
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def merge(merged, views):
+        for view, data in views.items():
+            total = merged[view]
+            for status, count in data['statuses'].items():
+                total['statuses'][status] += count
+            for index, count in enumerate(data['buckets']):
+                total['buckets'][index] += count
+            for key in ('count', 'sum', 'queries',
+                        'cache_hits', 'cache_misses'):
+                total[key] += data[key]
+
+    def retire_stale(self):
+        """
+        Сливает файлы давно не обновлявшихся процессов в общий файл,
+        чтобы каталог не рос с каждым перезапуском воркеров, а суммы
+        не уменьшались.
+        """
+        stale_before = time.time() - max(
+            self.flush_interval * STALE_FLUSH_INTERVALS, 60
+        )
+        retired_path = os.path.join(self.directory, RETIRED_FILE)
+        with open(os.path.join(self.directory, '.retire.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            stale = []
+            for path in glob.glob(
+                os.path.join(self.directory, 'metrics-*-*.json')
+            ):
+                try:
+                    if os.path.getmtime(path) < stale_before:
+                        stale.append(path)
+                except OSError:
+                    continue
+            if not stale:
+                return
+            retired = defaultdict(self._empty_view)
+            for path in [retired_path] + stale:
+                self.merge(retired, self.load(path))
+            tmp_path = f'{retired_path}.tmp'
+            with open(tmp_path, 'w') as file:
+                json.dump(retired, file)
+            os.replace(tmp_path, retired_path)
+            for path in stale:
+                os.remove(path)
+
+    def render(self):
+        """Метрики в текстовом формате Prometheus."""
+        views = self.collect()
+        lines = [
+            '# TYPE yatube_requests_total counter',
+        ]
+        for view, data in sorted(views.items()):
+            for status, count in sorted(data['statuses'].items()):
+                lines.append(
+                    f'yatube_requests_total{{view="{view}",'
+                    f'status="{status}"}} {count}'
+                )
+        lines.append('# TYPE yatube_request_duration_seconds histogram')
+        for view, data in sorted(views.items()):
+            for bound, count in zip(LATENCY_BUCKETS, data['buckets']):
+                lines.append(
+                    f'yatube_request_duration_seconds_bucket{{view="{view}",'
+                    f'le="{bound}"}} {count}'
+                )
+            lines.extend((
+                f'yatube_request_duration_seconds_bucket{{view="{view}",'
+                f'le="+Inf"}} {data["count"]}',
+                f'yatube_request_duration_seconds_sum{{view="{view}"}} '
+                f'{data["sum"]:.6f}',
+                f'yatube_request_duration_seconds_count{{view="{view}"}} '
+                f'{data["count"]}',
+            ))
+        lines.append('# TYPE yatube_db_queries_total counter')
+        for view, data in sorted(views.items()):
+            lines.append(
+                f'yatube_db_queries_total{{view="{view}"}} {data["queries"]}'
+            )
+        # доля попаданий считается в Prometheus по скоростям счётчиков
+        for metric, field in (
+            ('yatube_cache_hits_total', 'cache_hits'),
+            ('yatube_cache_misses_total', 'cache_misses'),
+        ):
+            lines.append(f'# TYPE {metric} counter')
+            for view, data in sorted(views.items()):
+                lines.append(f'{metric}{{view="{view}"}} {data[field]}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry(
+    directory=settings.METRICS_DIR,
+    flush_interval=settings.METRICS_FLUSH_INTERVAL,
+)
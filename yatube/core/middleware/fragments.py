@@ -0,0 +1,21 @@
+from core.fragments import stitch
+
+
+class UserFragmentsMiddleware:
+    """Подставляет пользовательские фрагменты в готовые HTML-ответы."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or not response.get(
+            'Content-Type', ''
+        ).startswith('text/html'):
+            return response
+        content = stitch(request, response.content)
+        if content is not response.content:
+            response.content = content
+            if response.has_header('Content-Length'):
+                response['Content-Length'] = str(len(content))
+        return response
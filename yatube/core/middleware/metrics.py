@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from core.instrumentation import collect_stats, current_stats
+from core.metrics import registry
+
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+class MetricsMiddleware:
+    """
+    Учитывает в реестре метрик количество запросов, коды ответов,
+    время обработки, число SQL-запросов и попадания в кеш по имени URL.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        stats = current_stats()
+        if stats is None:
+            with collect_stats() as stats:
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+        match = request.resolver_match
+        registry.observe(
+            match.view_name if match else UNRESOLVED_VIEW,
+            response.status_code,
+            time.perf_counter() - start,
+            stats,
+        )
+        return response
@@ -0,0 +1,86 @@
+import logging
+import re
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.base import Template
+
+logger = logging.getLogger('yatube.nplusone')
+
+TEMPLATE_RENDER_CODE = Template._render.__code__
+IN_PARAMS = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def query_shape(sql):
+    """SQL-запрос без различий в длине списков IN (...)."""
+    return IN_PARAMS.sub('IN (...)', sql)
+
+
+def rendering_template():
+    """Имя шаблона, который сейчас рендерится, или None."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_code is TEMPLATE_RENDER_CODE:
+            return frame.f_locals['self'].origin.template_name
+        frame = frame.f_back
+    return None
+
+
+class NPlusOneDetector:
+    """
+    Считает одинаковые по форме запросы из одного шаблона (или из кода
+    представления) и запоминает те, что повторились больше порога.
+    """
+
+    def __init__(self, threshold, ignore=()):
+        self.threshold = threshold
+        self.ignore = ignore
+        self.counts = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        if not any(table in sql for table in self.ignore):
+            self.counts[query_shape(sql), rendering_template()] += 1
+        return execute(sql, params, many, context)
+
+    @property
+    def repeated(self):
+        return [
+            (sql, template, count)
+            for (sql, template), count in self.counts.items()
+            if count > self.threshold
+        ]
+
+
+class NPlusOneMiddleware:
+    """
+    Ищет N+1 запросы: в режиме 'raise' (тесты) выбрасывает NPlusOneError,
+    в режиме 'log' (staging) пишет предупреждение в лог.
+    """
+
+    def __init__(self, get_response):
+        if settings.NPLUSONE_MODE not in ('raise', 'log'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        detector = NPlusOneDetector(
+            settings.NPLUSONE_THRESHOLD, settings.NPLUSONE_IGNORE
+        )
+        with connections['default'].execute_wrapper(detector):
+            response = self.get_response(request)
+        for sql, template, count in detector.repeated:
+            message = (
+                f'N+1 in {request.path} ({template or "view"}): '
+                f'{count} queries like {sql}'
+            )
+            if settings.NPLUSONE_MODE == 'raise':
+                raise NPlusOneError(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,102 @@
+import cProfile
+import json
+import os
+import re
+import secrets
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+
+from core.instrumentation import collect_stats
+from core.shared_cache import shared_cache
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_PARAM = '_profile'
+PROFILE_SALT = 'core.profiling'
+PROFILE_NONCE_KEY = 'profiling:nonce:{}'
+
+
+def make_profile_token(path):
+    """
+    Подписанное значение заголовка X-Profile: одноразовое и только для
+    запроса к path, см. manage.py profile_token.
+    """
+    return signing.dumps(
+        {'path': path, 'nonce': secrets.token_hex(8)}, salt=PROFILE_SALT
+    )
+
+
+def check_profile_token(token, path):
+    """Проверяет подпись, срок, путь и что токен ещё не использован."""
+    try:
+        payload = signing.loads(
+            token, salt=PROFILE_SALT, max_age=settings.PROFILE_TOKEN_AGE
+        )
+    except signing.BadSignature:
+        return False
+    if not isinstance(payload, dict) or payload.get('path') != path:
+        return False
+    # общий кеш: токен не использовать повторно в другом воркере
+    return shared_cache().add(
+        PROFILE_NONCE_KEY.format(payload['nonce']),
+        True,
+        settings.PROFILE_TOKEN_AGE
+    )
+
+
+class ProfilingMiddleware:
+    """
+    Выполняет запрос под cProfile и сохраняет профиль вместе с трассой
+    SQL-запросов в каталог PROFILES_DIR.
+
+    Профилируются запросы сотрудников с параметром ?_profile и запросы
+    с действительным одноразовым заголовком X-Profile для их пути.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        with collect_stats() as stats:
+            response = profiler.runcall(self.get_response, request)
+        total = time.perf_counter() - start
+        name = '{}-{}'.format(
+            datetime.now().strftime('%Y%m%d-%H%M%S-%f'),
+            re.sub(r'[^\w-]+', '_', request.path).strip('_') or 'index'
+        )
+        os.makedirs(settings.PROFILES_DIR, exist_ok=True)
+        profiler.dump_stats(
+            os.path.join(settings.PROFILES_DIR, f'{name}.prof')
+        )
+        trace = {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'queries': [
+                {'sql': sql, 'ms': round(duration * 1000, 3)}
+                for sql, duration in stats.queries
+            ],
+        }
+        with open(os.path.join(settings.PROFILES_DIR, f'{name}.sql.json'),
+                  'w') as file:
+            json.dump(trace, file, ensure_ascii=False, indent=2)
+        return response
+
+    @staticmethod
+    def should_profile(request):
+        if PROFILE_PARAM in request.GET and request.user.is_staff:
+            return True
+        token = request.META.get(PROFILE_HEADER)
+        if not token:
+            return False
+        return check_profile_token(token, request.path)
@@ -0,0 +1,57 @@
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from core.instrumentation import collect_stats
+
+logger = logging.getLogger('yatube.requests')
+
+
+class ServerTimingMiddleware:
+    """
+    Добавляет в ответ заголовок Server-Timing с количеством и временем
+    SQL-запросов, временем рендеринга шаблонов и попаданиями в кеш,
+    пишет структурированную строку в лог и отдельно логирует медленные
+    запросы вместе с самыми долгими SQL-запросами.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with collect_stats() as stats:
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+        response['Server-Timing'] = ', '.join((
+            f'sql;dur={stats.sql_time * 1000:.1f};'
+            f'desc="{stats.query_count} queries"',
+            f'tpl;dur={stats.template_time * 1000:.1f}',
+            f'cache;desc="{stats.cache_hits} hits, '
+            f'{stats.cache_misses} misses"',
+            f'total;dur={total * 1000:.1f}',
+        ))
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'sql_count': stats.query_count,
+            'sql_ms': round(stats.sql_time * 1000, 1),
+            'template_ms': round(stats.template_time * 1000, 1),
+            'cache_hits': stats.cache_hits,
+            'cache_misses': stats.cache_misses,
+        }
+        logger.info(json.dumps(record, ensure_ascii=False))
+        if total >= settings.SLOW_REQUEST_THRESHOLD:
+            record['top_queries'] = [
+                {'sql': sql, 'ms': round(duration * 1000, 1)}
+                for sql, duration in stats.top_queries()
+            ]
+            logger.warning(json.dumps(record, ensure_ascii=False))
+        return response
@@ -0,0 +1,30 @@
+import logging
+
+from django.shortcuts import render
+
+from core.write_queue import WriteTimeout
+
+logger = logging.getLogger('yatube.write_queue')
+
+# через сколько секунд клиенту стоит повторить запрос
+RETRY_AFTER = 5
+
+
+class WriteTimeoutMiddleware:
+    """Перегруженный писатель даёт 503 с Retry-After, а не ошибку 500."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, WriteTimeout):
+            return None
+        logger.warning(
+            'Запись %s не выполнена вовремя: %s', exception, request.path
+        )
+        response = render(request, 'core/503.html', status=503)
+        response['Retry-After'] = RETRY_AFTER
+        return response
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackfillCheckpoint',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Название')),
+                ('last_pk', models.BigIntegerField(default=0, verbose_name='Последний обработанный id')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Обработано строк')),
+                ('done', models.BooleanField(default=False, verbose_name='Завершено')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'Контрольная точка заполнения',
+                'verbose_name_plural': 'Контрольные точки заполнения',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class BackfillCheckpoint(models.Model):
+    """Докуда дошло заполнение данных, см. core.backfill."""
+    name = models.CharField('Название', max_length=100, primary_key=True)
+    last_pk = models.BigIntegerField('Последний обработанный id', default=0)
+    processed = models.PositiveIntegerField('Обработано строк', default=0)
+    done = models.BooleanField('Завершено', default=False)
+    updated = models.DateTimeField('Обновлено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Контрольная точка заполнения'
+        verbose_name_plural = 'Контрольные точки заполнения'
+
+    def __str__(self):
+        return f'{self.name}: {self.processed}'
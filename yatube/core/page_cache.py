@@ -0,0 +1,66 @@
+"""
+Кеш HTML страницы целиком, один для всех пользователей.
+
+Тело ответа кешируется по адресу до запуска представления, поэтому
+попадание в кеш не выполняет ни одного запроса к базе, включая COUNT
+пагинатора. Всё, что зависит от пользователя, в тело не попадает:
+на его месте стоят метки core.fragments, и UserFragmentsMiddleware
+заполняет их для каждого запроса уже после кеша.
+
+Тела лежат в кеше PAGE_CACHE_ALIAS: в prod это общий кеш shared, и
+страницу, отрисованную одним воркером или manage.py warm_caches, отдают
+все. Ключ включает поколение страниц из общего кеша: новые и изменённые
+посты и комментарии видны сразу во всех воркерах, остальное — по
+истечении timeout.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from core.shared_cache import bump_generation, get_generation
+
+PAGE_KEY = 'page:{}:{}'
+PAGES_GENERATION_KEY = 'pages:generation'
+
+
+def page_cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def page_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return PAGE_KEY.format(get_generation(PAGES_GENERATION_KEY), path)
+
+
+def cache_shared_page(timeout=None):
+    """
+    Декоратор представления, кеширующий его HTML для всех на timeout
+    секунд, по умолчанию PAGE_CACHE_TIMEOUT из настроек.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            cache = page_cache()
+            key = page_key(request)
+            content = cache.get(key)
+            if content is not None:
+                return HttpResponse(content)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                # метки фрагментов ещё не заменены: тело одно для всех
+                cache.set(
+                    key, response.content,
+                    timeout or settings.PAGE_CACHE_TIMEOUT
+                )
+            return response
+        return wrapped
+    return decorator
+
+
+def invalidate_pages():
+    bump_generation(PAGES_GENERATION_KEY)
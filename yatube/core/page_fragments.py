@@ -0,0 +1,17 @@
+from django.template.loader import render_to_string
+
+from core.fragments import register
+
+
+@register('header')
+def header(request, author_id=''):
+    """Шапка с меню текущего пользователя."""
+    return render_to_string(
+        'includes/header.html', {'author_id': author_id}, request=request
+    )
+
+
+@register('messages')
+def messages(request):
+    """Сообщения django.contrib.messages для текущего пользователя."""
+    return render_to_string('includes/messages.html', request=request)
@@ -0,0 +1,71 @@
+from contextlib import nullcontext
+
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+# ниже этого размера таблицы точный COUNT(*) достаточно быстрый
+ESTIMATE_THRESHOLD = 100000
+
+
+def estimate_count(queryset, dense=False):
+    """
+    Оценка числа строк в таблице модели без полного сканирования или None,
+    если статистики нет. Max(pk) годится только для плотных таблиц: после
+    удалений и переноса в архив он сильно завышает число строк.
+    """
+    model = queryset.model
+    table = model._meta.db_table
+    connection = connections[queryset.db]
+    # точка сохранения нужна, только чтобы ошибка не сломала внешнюю
+    # транзакцию; вне транзакции чтение обходится без BEGIN IMMEDIATE
+    # и блокировки на запись
+    savepoint = (
+        transaction.atomic(using=queryset.db)
+        if connection.in_atomic_block else nullcontext()
+    )
+    try:
+        with savepoint, connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                # заполняется командой ANALYZE
+                cursor.execute(
+                    'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                    [table]
+                )
+                row = cursor.fetchone()
+                if row:
+                    return int(row[0].split()[0])
+            elif connection.vendor == 'postgresql':
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    [table]
+                )
+                row = cursor.fetchone()
+                if row and row[0] > 0:
+                    return int(row[0])
+    except DatabaseError:
+        pass
+    if not dense:
+        return None
+    return model._default_manager.using(queryset.db).aggregate(
+        count=Max('pk')
+    )['count'] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator, который для больших нефильтрованных таблиц берёт оценку
+    числа строк вместо COUNT(*). Без статистики считает точно, если
+    таблица не отмечена плотной (без удалений строк).
+    """
+    dense = False
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = estimate_count(self.object_list, self.dense)
+            if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
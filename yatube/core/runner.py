@@ -0,0 +1,10 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class NPlusOneDiscoverRunner(DiscoverRunner):
+    """Запускает тесты с обязательной проверкой на N+1 запросы."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.NPLUSONE_MODE = 'raise'
@@ -0,0 +1,38 @@
+"""
+Кеш, общий для всех процессов сайта. Данные, которые сбрасываются при
+записи, нельзя держать в LocMemCache процесса: сброс в одном воркере не
+виден остальным. В dev и тестах процесс один, и алиас shared указывает на
+LocMemCache; в prod — на memcached или таблицу в базе.
+"""
+import time
+
+from django.core.cache import caches
+
+SHARED_CACHE = 'shared'
+
+
+def shared_cache():
+    return caches[SHARED_CACHE]
+
+
+def get_generation(key):
+    """
+    Поколение данных: входит в ключи их кеша, поэтому запись, начатая
+    до сброса, ложится под старый ключ и больше не читается.
+    """
+    cache = shared_cache()
+    generation = cache.get(key)
+    if generation is None:
+        # после вытеснения поколение не должно совпасть со старым
+        generation = time.time_ns()
+        if not cache.add(key, generation, None):
+            generation = cache.get(key, generation)
+    return generation
+
+
+def bump_generation(key):
+    cache = shared_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
@@ -0,0 +1,11 @@
+from django import template
+
+from core.fragments import marker
+
+register = template.Library()
+
+
+@register.simple_tag
+def user_fragment(name, *args):
+    """Место для фрагмента, который заполнится для каждого пользователя."""
+    return marker(name, *args)
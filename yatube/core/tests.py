@@ -1,6 +1,50 @@
+import importlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
 from http import HTTPStatus
+from concurrent.futures import Future
+from io import StringIO
+from unittest import mock
 
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, connection
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.test import (
+    RequestFactory, TestCase, TransactionTestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.backends import auth
+from core.backends.auth import CachedModelBackend
+from core.backfill import Backfill, backfills, run_backfill
+from core.backup import backup_database, verify
+from core.checks import check_session_caches
+from core.fragments import marker, register, renderers, stitch
+from core.instrumentation import RequestStats
+from core.metrics import MetricsRegistry, registry
+from core.middleware.nplusone import NPlusOneDetector, NPlusOneError
+from core.middleware.profiling import make_profile_token
+from core.models import BackfillCheckpoint
+from core.paginator import estimate_count
+from core.shared_cache import shared_cache
+from core.write_queue import WriteQueue, WriteTimeout, run_write, writer
+from posts.models import Group, Post, User
+from yatube import wsgi
+
+PROFILES_DIR = tempfile.mkdtemp()
+SHARED_DATABASE_CACHE = {
+    'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+    'LOCATION': 'yatube_cache',
+}
 
 
 class ViewTestClass(TestCase):
@@ -8,3 +52,544 @@ class ViewTestClass(TestCase):
         response = self.client.get('/nonexist-page/')
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+@override_settings(SERVER_TIMING=True)
+class ServerTimingMiddlewareTestClass(TestCase):
+    def test_server_timing_header(self):
+        """Ответ содержит заголовок Server-Timing со статистикой запроса."""
+        response = self.client.get('/')
+        header = response['Server-Timing']
+        for metric in ('sql;', 'tpl;', 'cache;', 'total;'):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, header)
+
+    @override_settings(SLOW_REQUEST_THRESHOLD=0)
+    def test_slow_request_logged_with_top_queries(self):
+        """Медленный запрос логируется вместе с самыми долгими запросами."""
+        with self.assertLogs('yatube.requests', 'WARNING') as logs:
+            self.client.get('/')
+        self.assertIn('top_queries', logs.output[0])
+
+
+@override_settings(METRICS_ENABLED=True)
+class MetricsTestClass(TestCase):
+    def setUp(self):
+        self.directory = registry.directory
+        registry.directory = None
+        registry.reset()
+
+    def tearDown(self):
+        registry.directory = self.directory
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint(self):
+        """Метрики отдаются в формате Prometheus по имени URL."""
+        self.client.get(reverse('posts:index'))
+        response = self.client.get(
+            reverse('core:metrics'), HTTP_AUTHORIZATION='Bearer secret'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        content = response.content.decode()
+        self.assertIn(
+            'yatube_requests_total{view="posts:index",status="200"}',
+            content
+        )
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 1',
+            content
+        )
+        self.assertIn('yatube_db_queries_total{view="posts:index"}', content)
+        self.assertIn('yatube_cache_hits_total{view="posts:index"}', content)
+        self.assertIn(
+            'yatube_cache_misses_total{view="posts:index"}', content
+        )
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_require_token(self):
+        """Без токена метрики недоступны, даже с адреса прокси."""
+        for headers in (
+            {},
+            {'HTTP_AUTHORIZATION': 'Bearer wrong'},
+            {'HTTP_AUTHORIZATION': 'secret'},
+        ):
+            with self.subTest(headers=headers):
+                response = self.client.get(
+                    reverse('core:metrics'), REMOTE_ADDR='127.0.0.1',
+                    **headers
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_FOUND
+                )
+
+    def test_metrics_aggregated_across_processes(self):
+        """Метрики других процессов суммируются через общий каталог."""
+        with tempfile.TemporaryDirectory() as directory:
+            worker = MetricsRegistry(directory, flush_interval=0)
+            worker.observe('posts:index', 200, 0.01, RequestStats())
+            os.rename(
+                worker.path, os.path.join(directory, 'metrics-0.json')
+            )
+            current = MetricsRegistry(directory, flush_interval=0)
+            current.observe('posts:index', 200, 0.01, RequestStats())
+            views = current.collect()
+        self.assertEqual(views['posts:index']['count'], 2)
+        self.assertEqual(views['posts:index']['statuses']['200'], 2)
+
+    def test_stale_files_retired(self):
+        """Файл завершившегося процесса сливается в общий и удаляется."""
+        with tempfile.TemporaryDirectory() as directory:
+            worker = MetricsRegistry(directory, flush_interval=0)
+            worker.observe('posts:index', 200, 0.01, RequestStats())
+            dead_path = os.path.join(directory, 'metrics-1-dead.json')
+            os.rename(worker.path, dead_path)
+            os.utime(dead_path, (0, 0))
+            current = MetricsRegistry(directory, flush_interval=0)
+            current.observe('posts:index', 200, 0.01, RequestStats())
+            views = current.collect()
+            self.assertFalse(os.path.exists(dead_path))
+            self.assertEqual(current.collect()['posts:index']['count'], 2)
+        self.assertEqual(views['posts:index']['count'], 2)
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILES_DIR=PROFILES_DIR)
+class ProfilingTestClass(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(PROFILES_DIR, ignore_errors=True)
+
+    def setUp(self):
+        for name in os.listdir(PROFILES_DIR):
+            os.remove(os.path.join(PROFILES_DIR, name))
+
+    def test_signed_header_request_profiled(self):
+        """Запрос с подписанным заголовком профилируется."""
+        self.client.get('/', HTTP_X_PROFILE=make_profile_token('/'))
+        self.assertEqual(len(os.listdir(PROFILES_DIR)), 2)
+
+    def test_token_single_use_and_bound_to_path(self):
+        """Токен действует один раз и только для своего пути."""
+        token = make_profile_token('/')
+        self.client.get('/about/author/', HTTP_X_PROFILE=token)
+        self.assertEqual(os.listdir(PROFILES_DIR), [])
+        self.client.get('/', HTTP_X_PROFILE=token)
+        # повтор в другом воркере, у которого кеш default свой
+        cache.clear()
+        self.client.get('/', HTTP_X_PROFILE=token)
+        self.assertEqual(len(os.listdir(PROFILES_DIR)), 2)
+
+    def test_unsigned_request_not_profiled(self):
+        """Запросы без подписи и без ?_profile не профилируются."""
+        self.client.get('/', HTTP_X_PROFILE='profile')
+        self.client.get('/?_profile')
+        self.assertEqual(os.listdir(PROFILES_DIR), [])
+
+    def test_staff_can_list_and_download_profiles(self):
+        """Сотрудник может профилировать запрос и скачать профиль."""
+        self.client.force_login(self.staff)
+        self.client.get('/?_profile')
+        response = self.client.get(reverse('core:profiles'))
+        files = response.context['files']
+        self.assertEqual(len(files), 2)
+        response = self.client.get(
+            reverse('core:profile_download', args=[files[0]])
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+class NPlusOneTestClass(TestCase):
+    def test_detector_counts_repeated_queries(self):
+        """Одинаковые по форме запросы считаются одним N+1."""
+        detector = NPlusOneDetector(threshold=3)
+        with connection.execute_wrapper(detector):
+            for pk in range(4):
+                Post.objects.filter(pk=pk).exists()
+            Post.objects.filter(pk__in=[1, 2]).exists()
+            Post.objects.filter(pk__in=[1, 2, 3]).exists()
+        self.assertEqual(len(detector.repeated), 1)
+        self.assertEqual(detector.repeated[0][2], 4)
+
+    @override_settings(NPLUSONE_THRESHOLD=0)
+    def test_middleware_raises_in_tests(self):
+        """В тестах найденный N+1 приводит к ошибке."""
+        cache.clear()
+        with self.assertRaises(NPlusOneError):
+            self.client.get('/')
+
+
+class UserFragmentsTestClass(TestCase):
+    def tearDown(self):
+        renderers.pop('greeting', None)
+
+    def test_markers_replaced_per_user(self):
+        """Метки в общем HTML заменяются фрагментами текущего запроса."""
+        register('greeting')(lambda request, name: f'<b>{name}</b>')
+        request = RequestFactory().get('/')
+        content = ('<p>' + marker('greeting', 'guest') + '</p>').encode()
+        self.assertEqual(stitch(request, content), b'<p><b>guest</b></p>')
+        self.assertEqual(stitch(request, b'<p></p>'), b'<p></p>')
+
+    def test_cached_page_has_author_controls(self):
+        """Автор видит свои ссылки на странице, закешированной гостем."""
+        author = User.objects.create_user(username='author')
+        post = Post.objects.create(text='Тестовый пост', author=author)
+        edit_url = reverse('posts:post_edit', args=[post.pk])
+        cache.clear()
+        content = self.client.get('/').content
+        self.assertNotIn(b'user-fragment', content)
+        self.assertNotIn(edit_url.encode(), content)
+        Post.objects.all().delete()
+        self.client.force_login(author)
+        response = self.client.get('/')
+        self.assertIn(edit_url.encode(), response.content)
+
+
+CACHED_AUTH = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+    'AUTHENTICATION_BACKENDS': [
+        'core.backends.auth.CachedModelBackend',
+        'django.contrib.auth.backends.ModelBackend',
+    ],
+}
+
+
+@override_settings(**CACHED_AUTH)
+class CachedAuthTestClass(TestCase):
+    def setUp(self):
+        cache.clear()
+        shared_cache().clear()
+        self.user = User.objects.create_user(username='user')
+        self.client.force_login(self.user)
+        self.client.get('/')
+
+    def test_no_session_or_user_queries(self):
+        """Повторный запрос не читает из базы ни сессию, ни пользователя."""
+        with CaptureQueriesContext(connection) as context:
+            self.client.get('/')
+        for query in context:
+            with self.subTest(sql=query['sql']):
+                self.assertNotIn('django_session', query['sql'])
+                self.assertNotIn('FROM "auth_user"', query['sql'])
+
+    def test_password_change_logs_out(self):
+        """После смены пароля старая сессия больше не действует."""
+        self.user.set_password('new-password')
+        self.user.save()
+        response = self.client.get('/')
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def changes_seen_by_other_worker(self, first, second):
+        """
+        Выход и блокировка в воркере с кешем second; видит ли их воркер
+        с кешем first, уже закешировавший сессию и пользователя.
+        """
+        session = SessionStore()
+        session['user'] = self.user.pk
+        session._cache = first
+        session.save()
+        with mock.patch.object(auth, 'shared_cache', return_value=first):
+            CachedModelBackend().get_user(self.user.pk)
+        logout = SessionStore(session.session_key)
+        logout._cache = second
+        logout.delete()
+        with mock.patch.object(auth, 'shared_cache', return_value=second):
+            self.user.is_active = False
+            self.user.save()
+        session = SessionStore(session.session_key)
+        session._cache = first
+        with mock.patch.object(auth, 'shared_cache', return_value=first):
+            user = CachedModelBackend().get_user(self.user.pk)
+        return 'user' not in session and user is None
+
+    def test_shared_cache_between_workers(self):
+        """С общим кешем воркер видит выход и блокировку из другого."""
+        with override_settings(CACHES={'shared': SHARED_DATABASE_CACHE}):
+            call_command('createcachetable', verbosity=0)
+        self.assertTrue(self.changes_seen_by_other_worker(*(
+            DatabaseCache(SHARED_DATABASE_CACHE['LOCATION'], {})
+            for _ in range(2)
+        )))
+
+    def test_process_caches_rejected(self):
+        """Кеш в памяти каждого воркера свой, такие настройки отвергаются."""
+        self.assertFalse(self.changes_seen_by_other_worker(
+            LocMemCache('worker-1', {}), LocMemCache('worker-2', {})
+        ))
+        self.assertEqual(
+            [error.id for error in check_session_caches(None)],
+            ['core.E001', 'core.E002']
+        )
+        with override_settings(
+            CACHES={**settings.CACHES, 'shared': SHARED_DATABASE_CACHE}
+        ):
+            self.assertEqual(check_session_caches(None), [])
+
+    def test_benchmark_keeps_site_caches(self):
+        """Бенчмарк сессий работает со своими кешами, не сбрасывая общие."""
+        cache.set('page', 'cached')
+        shared_cache().set('generation', 1)
+        call_command('bench_auth', repeat=1, stdout=StringIO())
+        self.assertEqual(cache.get('page'), 'cached')
+        self.assertEqual(shared_cache().get('generation'), 1)
+        self.assertFalse(User.objects.filter(username='bench_auth').exists())
+
+
+class WarmCachesTestClass(TestCase):
+    def setUp(self):
+        author = User.objects.create_user(username='author')
+        Post.objects.create(text='Тестовый пост', author=author)
+        cache.clear()
+        shared_cache().clear()
+
+    def test_command_prerenders_pages(self):
+        """После прогрева главная отдаётся из кеша без запросов к базе."""
+        out = StringIO()
+        call_command('warm_caches', stdout=out)
+        self.assertIn('страницы: 1', out.getvalue())
+        with self.assertNumQueries(0):
+            response = self.client.get('/')
+        self.assertContains(response, 'Тестовый пост')
+
+    @override_settings(PAGE_CACHE_ALIAS='shared')
+    def test_pages_warmed_for_other_processes(self):
+        """Страницы прогрева лежат в общем кеше, а не в кеше команды."""
+        call_command('warm_caches', stdout=StringIO())
+        # кеш default у каждого процесса свой
+        cache.clear()
+        with self.assertNumQueries(0):
+            response = self.client.get('/')
+        self.assertContains(response, 'Тестовый пост')
+
+    @override_settings(WARM_CACHES_ON_START=True)
+    def test_worker_warms_on_wsgi_load(self):
+        """Воркер прогревает кеши при загрузке WSGI-приложения."""
+        with mock.patch('core.warmup.warm_caches', return_value=[]) as warm, \
+                mock.patch('core.warmup.connections'):
+            importlib.reload(wsgi)
+        warm.assert_called_once_with()
+
+
+class SqliteBackendTestClass(TestCase):
+    def test_connection_pragmas(self):
+        """Новое соединение получает прагмы настроенного бэкенда."""
+        with connection.cursor() as cursor:
+            for pragma, expected in (
+                ('busy_timeout', 5000),
+                ('synchronous', 1),
+                ('cache_size', -64 * 1024),
+            ):
+                with self.subTest(pragma=pragma):
+                    cursor.execute(f'PRAGMA {pragma}')
+                    self.assertEqual(cursor.fetchone()[0], expected)
+
+
+class EstimateCountTestClass(TransactionTestCase):
+    def test_estimate_takes_no_write_lock(self):
+        """Оценка числа строк вне транзакции не начинает BEGIN IMMEDIATE."""
+        with CaptureQueriesContext(connection) as context:
+            estimate_count(Post.objects.all())
+        self.assertTrue(context.captured_queries)
+        for query in context:
+            with self.subTest(sql=query['sql']):
+                self.assertNotIn('BEGIN', query['sql'])
+
+
+class WriteQueueTestClass(TransactionTestCase):
+    def test_writes_in_background_thread(self):
+        """Записи выполняются писателем, ошибка одной не мешает другим."""
+        writer = WriteQueue()
+        futures = [
+            writer.submit(Group.objects.create, title='Группа', slug='one'),
+            writer.submit(Group.objects.create, title='Дубль', slug='one'),
+            writer.submit(Group.objects.create, title='Группа', slug='two'),
+        ]
+        self.assertEqual(futures[0].result(5).slug, 'one')
+        with self.assertRaises(IntegrityError):
+            futures[1].result(5)
+        self.assertEqual(futures[2].result(5).slug, 'two')
+        self.assertEqual(
+            sorted(Group.objects.values_list('slug', flat=True)),
+            ['one', 'two']
+        )
+
+    def test_connection_error_fails_batch(self):
+        """Ошибка соединения завершает записи пачки, писатель работает."""
+        writer = WriteQueue()
+        with mock.patch.object(
+            BaseDatabaseWrapper, 'close_if_unusable_or_obsolete',
+            side_effect=DatabaseError
+        ):
+            future = writer.submit(Group.objects.create, slug='one')
+            with self.assertRaises(DatabaseError):
+                future.result(5)
+        future = writer.submit(Group.objects.create, slug='two')
+        self.assertEqual(future.result(5).slug, 'two')
+
+    def test_dead_writer_restarted(self):
+        """Погибший поток писателя заменяется при следующей записи."""
+        writer = WriteQueue()
+        with mock.patch.object(writer, 'write_batch', side_effect=SystemExit):
+            writer.submit(Group.objects.create, slug='lost')
+            writer.thread.join(5)
+        self.assertFalse(writer.thread.is_alive())
+        future = writer.submit(Group.objects.create, slug='one')
+        self.assertEqual(future.result(5).slug, 'one')
+
+    @override_settings(WRITE_QUEUE_ENABLED=True, WRITE_QUEUE_TIMEOUT=0)
+    def test_timeout_returns_503(self):
+        """Не дождавшийся писателя запрос получает 503, а не 500."""
+        user, author = (
+            User.objects.create_user(username=username)
+            for username in ('user', 'author')
+        )
+        self.client.force_login(user)
+        with mock.patch.object(
+            writer, 'submit', side_effect=lambda *args, **kwargs: Future()
+        ):
+            with self.assertLogs('yatube.write_queue', 'WARNING'):
+                response = self.client.get(
+                    reverse('posts:profile_follow', args=[author.username])
+                )
+            self.assertEqual(
+                response.status_code, HTTPStatus.SERVICE_UNAVAILABLE
+            )
+            self.assertIn('Retry-After', response)
+            response = self.client.post(
+                reverse('posts:profile_follow_json', args=[author.username])
+            )
+            self.assertEqual(
+                response.status_code, HTTPStatus.SERVICE_UNAVAILABLE
+            )
+
+    @override_settings(WRITE_QUEUE_ENABLED=True, WRITE_QUEUE_TIMEOUT=0.05)
+    def test_timed_out_write_never_runs(self):
+        """Запись, не дождавшаяся писателя, отменяется и не выполняется."""
+        started, release = threading.Event(), threading.Event()
+
+        def busy():
+            started.set()
+            release.wait(5)
+
+        with mock.patch('core.write_queue.writer', WriteQueue()) as queue:
+            queue.submit(busy)
+            started.wait(5)
+            with self.assertRaises(WriteTimeout):
+                run_write(Group.objects.create, title='Группа', slug='late')
+            release.set()
+            queue.submit(Group.objects.create, slug='next').result(5)
+        self.assertEqual(
+            list(Group.objects.values_list('slug', flat=True)), ['next']
+        )
+
+
+class BackupTestClass(TransactionTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_compressed_backup_verified(self):
+        """Сжатая копия создаётся и проходит проверку восстановления."""
+        Group.objects.create(title='Группа', slug='group')
+        path = os.path.join(self.directory, 'copy.sqlite3')
+        out = StringIO()
+        call_command(
+            'backup_db', output=path, pages=1, pause=0,
+            compress=True, verify=True, stdout=out
+        )
+        self.assertTrue(os.path.exists(f'{path}.gz'))
+        self.assertIn('Проверка восстановления пройдена', out.getvalue())
+
+    def test_backup_falls_back_to_vacuum_under_writes(self):
+        """
+        Если источник меняется на каждом шаге, копирование после
+        нескольких перезапусков снимается через VACUUM INTO.
+        """
+        name = os.path.join(self.directory, 'source.sqlite3')
+        source = sqlite3.connect(name)
+        source.execute('CREATE TABLE django_migrations (app, name)')
+        source.execute('CREATE TABLE rows (value)')
+        source.executemany(
+            'INSERT INTO rows VALUES (?)', [('x' * 1000,)] * 100
+        )
+        source.commit()
+        steps = []
+
+        def write(pause):
+            steps.append(pause)
+            source.execute('INSERT INTO rows VALUES (?)', ('y',))
+            source.commit()
+
+        path = os.path.join(self.directory, 'copy.sqlite3')
+        with mock.patch('core.backup.time.sleep', write):
+            method = backup_database(name, path, pages=5, max_restarts=2)
+        self.assertEqual(method, 'vacuum')
+        self.assertGreater(len(steps), 2)
+        copy = sqlite3.connect(path)
+        self.addCleanup(copy.close)
+        self.addCleanup(source.close)
+        self.assertEqual(
+            copy.execute('SELECT COUNT(*) FROM rows').fetchone()[0],
+            100 + len(steps)
+        )
+        self.assertEqual(verify(path, name), [])
+
+
+class GroupDescriptions(Backfill):
+    name = 'test_group_descriptions'
+    pause = 0
+
+    def __init__(self, fail_after=None):
+        super().__init__()
+        self.fail_after = fail_after
+        self.chunks = 0
+
+    def get_queryset(self):
+        return Group.objects.filter(description='')
+
+    def process(self, chunk):
+        if self.chunks == self.fail_after:
+            raise RuntimeError('сбой')
+        self.chunks += 1
+        chunk.update(description='Заполнено')
+
+
+class BackfillTestClass(TestCase):
+    def setUp(self):
+        Group.objects.bulk_create(
+            Group(title=f'Группа {number}', slug=f'group-{number}')
+            for number in range(5)
+        )
+
+    def test_resumes_from_checkpoint(self):
+        """После сбоя заполнение продолжается с последней пачки."""
+        with self.assertRaises(RuntimeError):
+            run_backfill(GroupDescriptions(fail_after=1), batch_size=2)
+        checkpoint = BackfillCheckpoint.objects.get(
+            name=GroupDescriptions.name
+        )
+        self.assertEqual(checkpoint.processed, 2)
+        self.assertFalse(checkpoint.done)
+        backfill = GroupDescriptions()
+        checkpoint = run_backfill(backfill, batch_size=2)
+        self.assertEqual(backfill.chunks, 2)
+        self.assertEqual(checkpoint.processed, 5)
+        self.assertTrue(checkpoint.done)
+        self.assertFalse(Group.objects.filter(description='').exists())
+
+    def test_command(self):
+        """Команда запускает заполнение из реестра и показывает статус."""
+        backfills[GroupDescriptions.name] = GroupDescriptions
+        self.addCleanup(backfills.pop, GroupDescriptions.name)
+        out = StringIO()
+        call_command(
+            'backfill', GroupDescriptions.name, batch_size=2, stdout=out
+        )
+        self.assertIn('обработано строк 5', out.getvalue())
+        call_command('backfill', stdout=out)
+        self.assertIn(f'{GroupDescriptions.name}: завершено', out.getvalue())
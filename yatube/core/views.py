@@ -1,5 +1,15 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import render
 
+from core.metrics import registry
+
+PROFILE_EXTENSIONS = ('.prof', '.sql.json')
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -15,3 +25,52 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def has_metrics_token(request):
+    """
+    Заголовок Authorization: Bearer METRICS_TOKEN. Адрес клиента не
+    проверяется: за обратным прокси все запросы приходят с 127.0.0.1.
+    """
+    token = settings.METRICS_TOKEN
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    return bool(token) and hmac.compare_digest(
+        authorization.encode(), f'Bearer {token}'.encode()
+    )
+
+
+def metrics(request):
+    """Метрики в формате Prometheus для сборщика с токеном и сотрудников."""
+    if not (has_metrics_token(request) or request.user.is_staff):
+        raise Http404
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+@staff_member_required
+def profiles(request):
+    """Список сохранённых профилей запросов."""
+    try:
+        names = os.listdir(settings.PROFILES_DIR)
+    except FileNotFoundError:
+        names = []
+    files = sorted(
+        (name for name in names if name.endswith(PROFILE_EXTENSIONS)),
+        reverse=True
+    )
+    return render(request, 'core/profiles.html', {'files': files})
+
+
+@staff_member_required
+def profile_download(request, name):
+    """Скачивание файла профиля."""
+    if os.path.basename(name) != name or not name.endswith(
+        PROFILE_EXTENSIONS
+    ):
+        raise Http404
+    path = os.path.join(settings.PROFILES_DIR, name)
+    if not os.path.isfile(path):
+        raise Http404
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=name)
@@ -0,0 +1,118 @@
+"""
+Прогрев кешей процесса после деплоя: шаблоны, URL-резолверы и первые
+страницы популярных лент.
+
+Страницы для прогрева объявляются в модулях warmup приложений:
+
+    @register
+    def pages(limit):
+        yield reverse('posts:index')
+
+Запуск: manage.py warm_caches после деплоя. Страницы кладутся в кеш
+PAGE_CACHE_ALIAS (см. core.page_cache), в prod он общий, и отрисованные
+командой страницы сразу отдают все воркеры, пока не истёк
+PAGE_CACHE_TIMEOUT или не сменилось поколение страниц.
+
+Шаблоны и URL-резолверы живут в памяти процесса: их прогревает каждый
+воркер при загрузке yatube.wsgi, если WARM_CACHES_ON_START включён.
+"""
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.test import RequestFactory
+from django.urls import get_resolver, resolve
+from django.utils.module_loading import autodiscover_modules
+
+WARMUP_PAGES_LIMIT = 10
+
+logger = logging.getLogger('yatube.warmup')
+
+page_sources = []
+
+
+def register(source):
+    """Добавляет функцию source(limit), перечисляющую адреса страниц."""
+    page_sources.append(source)
+    return source
+
+
+def load_templates():
+    """Компилирует шаблоны проекта в кеш cached.Loader."""
+    loaded = 0
+    for engine in engines.all():
+        for directory in engine.engine.dirs:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    if not name.endswith('.html'):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        engine.get_template(
+                            os.path.relpath(path, directory)
+                        )
+                    except (TemplateDoesNotExist, TemplateSyntaxError):
+                        logger.warning('Шаблон %s не загружен', path)
+                        continue
+                    loaded += 1
+    return loaded
+
+
+def load_resolvers(resolver=None):
+    """Строит словари reverse() корневого и вложенных резолверов."""
+    resolver = resolver or get_resolver()
+    resolver.reverse_dict
+    loaded = 1
+    for _, nested in resolver.namespace_dict.values():
+        loaded += load_resolvers(nested)
+    return loaded
+
+
+def render_pages(limit=WARMUP_PAGES_LIMIT):
+    """
+    Рендерит страницы от имени гостя: тела лент кешируются без привязки
+    к пользователю, так что прогрев годится для всех.
+    """
+    autodiscover_modules('warmup')
+    factory = RequestFactory()
+    rendered = 0
+    for source in page_sources:
+        for path in source(limit):
+            request = factory.get(path)
+            request.user = AnonymousUser()
+            match = resolve(path)
+            match.func(request, *match.args, **match.kwargs)
+            rendered += 1
+    return rendered
+
+
+def warm_caches(limit=WARMUP_PAGES_LIMIT):
+    """Прогревает кеши и возвращает [(шаг, сколько, секунды)]."""
+    report = []
+    for step, function, args in (
+        ('шаблоны', load_templates, ()),
+        ('резолверы', load_resolvers, ()),
+        ('страницы', render_pages, (limit,)),
+    ):
+        started = time.perf_counter()
+        count = function(*args)
+        report.append((step, count, time.perf_counter() - started))
+    return report
+
+
+def warm_on_start():
+    """Прогрев кешей воркера при загрузке WSGI-приложения."""
+    if not settings.WARM_CACHES_ON_START:
+        return
+    try:
+        for step, count, seconds in warm_caches():
+            logger.info('Прогрев: %s %d за %.3f с', step, count, seconds)
+    except Exception:
+        # воркер с холодным кешем лучше, чем воркер, который не стартовал
+        logger.exception('Прогрев кешей не удался')
+    finally:
+        connections.close_all()
@@ -0,0 +1,124 @@
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+# сколько мелких записей объединять в одну транзакцию
+WRITE_BATCH_SIZE = 100
+
+logger = logging.getLogger('yatube.write_queue')
+
+
+class WriteTimeout(Exception):
+    """Писатель не успел выполнить запись за WRITE_QUEUE_TIMEOUT."""
+
+
+class WriteQueue:
+    """
+    Единственный писатель процесса: мелкие записи из разных запросов
+    выполняются отдельным потоком пачками в одной транзакции, а запрос
+    ждёт результат своей записи через Future.
+    """
+
+    def __init__(self, batch_size=WRITE_BATCH_SIZE, using=DEFAULT_DB_ALIAS):
+        self.batch_size = batch_size
+        self.using = using
+        self.lock = threading.Lock()
+        self.queue = None
+        self.pid = None
+        self.thread = None
+
+    def submit(self, func, *args, **kwargs):
+        future = Future()
+        self._ensure_started().put((func, args, kwargs, future))
+        return future
+
+    def _ensure_started(self):
+        with self.lock:
+            # после fork поток писателя остаётся в родительском процессе
+            if self.pid != os.getpid():
+                self.queue = queue.Queue()
+                self.pid = os.getpid()
+                self.thread = None
+            if self.thread is None or not self.thread.is_alive():
+                # упавший писатель заменяется новым на той же очереди
+                self.thread = threading.Thread(
+                    target=self._run,
+                    args=(self.queue,),
+                    name='write-queue',
+                    daemon=True
+                )
+                self.thread.start()
+            return self.queue
+
+    def _run(self, writes):
+        while True:
+            batch = [writes.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.write_batch(batch)
+            except Exception as error:
+                logger.exception('Пачка записей не выполнена')
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+
+    def write_batch(self, batch):
+        """
+        Одна транзакция на пачку; каждая запись в своей точке сохранения,
+        чтобы ошибка одной не откатывала остальные.
+        """
+        # запись, от которой запрос уже отказался по таймауту, не
+        # выполняется; остальные больше нельзя отменить
+        batch = [
+            write for write in batch if write[3].set_running_or_notify_cancel()
+        ]
+        results = []
+        try:
+            connections[self.using].close_if_unusable_or_obsolete()
+            with transaction.atomic(using=self.using):
+                for func, args, kwargs, future in batch:
+                    try:
+                        with transaction.atomic(using=self.using):
+                            results.append((future, func(*args, **kwargs)))
+                    except Exception as error:
+                        future.set_exception(error)
+        except Exception as error:
+            # записи пачки откачены, включая уже выполненные
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for future, result in results:
+            future.set_result(result)
+
+
+writer = WriteQueue()
+
+
+def run_write(func, *args, **kwargs):
+    """
+    Выполняет небольшую запись через очередь писателя, если она включена,
+    иначе сразу в своей транзакции. Возвращает результат func;
+    WriteTimeout, если писатель не успел: тогда запись отменена и не
+    выполнится, и повтор запроса её не задвоит.
+    """
+    if not settings.WRITE_QUEUE_ENABLED:
+        with transaction.atomic():
+            return func(*args, **kwargs)
+    future = writer.submit(func, *args, **kwargs)
+    try:
+        return future.result(settings.WRITE_QUEUE_TIMEOUT)
+    except TimeoutError:
+        if future.cancel():
+            raise WriteTimeout(func.__name__)
+    # писатель уже взял запись в пачку, её итог дожидается запрос
+    return future.result()
@@ -1,6 +1,20 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.template.response import TemplateResponse
+
+from core.paginator import EstimatedCountPaginator
 
 from .models import Comment, Follow, Group, Post
+from .moderation import delete_posts, move_to_group
+
+
+class MoveToGroupForm(forms.Form):
+    group = forms.ModelChoiceField(
+        Group.objects.all(),
+        required=False,
+        label='Группа',
+        help_text='Оставьте пустым, чтобы убрать посты из групп'
+    )
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -12,12 +26,98 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    autocomplete_fields = ('author',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
+    actions = ('move_to_group_action', 'delete_in_batches_action')
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # стандартное удаление загружает каждый пост и его комментарии
+        actions.pop('delete_selected', None)
+        return actions
+
+    def save_model(self, request, obj, form, change):
+        if change and form.changed_data:
+            obj.save(update_fields=form.changed_data)
+        else:
+            super().save_model(request, obj, form, change)
+
+    def move_to_group_action(self, request, queryset):
+        form = MoveToGroupForm(
+            request.POST if 'apply' in request.POST else None
+        )
+        if form.is_valid():
+            moved = move_to_group(queryset, form.cleaned_data['group'])
+            self.message_user(request, f'Перенесено постов: {moved}')
+            return None
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Перенос постов в группу',
+            'opts': self.model._meta,
+            'form': form,
+            'queryset': queryset,
+            'action_checkbox_name': admin.helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(
+            request, 'admin/posts/post/move_to_group.html', context
+        )
+    move_to_group_action.short_description = 'Перенести в группу'
+
+    def delete_in_batches_action(self, request, queryset):
+        deleted = delete_posts(queryset)
+        self.message_user(
+            request, f'Удалено постов: {deleted}', messages.SUCCESS
+        )
+    delete_in_batches_action.short_description = 'Удалить пачками'
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs
+        )
+        if db_field.name == 'group':
+            # список групп загружается один раз на все строки changelist
+            formfield.choices = list(formfield.choices)
+        return formfield
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug')
+    search_fields = ('title',)
+    prepopulated_fields = {'slug': ('title',)}
+
+
+class CommentAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'text',
+        'created',
+        'author',
+        'post',
+    )
+    list_select_related = ('author', 'post')
+    search_fields = ('text',)
+    list_filter = ('created',)
+    autocomplete_fields = ('author',)
+    raw_id_fields = ('post',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    search_fields = ('user__username', 'author__username')
+    autocomplete_fields = ('user', 'author')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
-admin.site.register(Comment)
-admin.site.register(Follow)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PostsConfig(AppConfig):
     name = 'posts'
     verbose_name = 'Социальная сеть'
+
+    def ready(self):
+        from . import fragments, signals  # noqa: F401
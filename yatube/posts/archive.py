@@ -0,0 +1,197 @@
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import ArchiveCount, Comment, Post, User
+from .moderation import batched_pks
+from .routers import ARCHIVE_DB
+
+ARCHIVE_AFTER_DAYS = 365
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_PAUSE = 0.05
+ALL_SCOPE = 'all'
+
+
+def post_scopes(post):
+    """Области ленты, в которые попадает пост."""
+    scopes = [ALL_SCOPE, f'author:{post.author_id}']
+    if post.group_id is not None:
+        scopes.append(f'group:{post.group_id}')
+    return scopes
+
+
+def archived_count(scope):
+    """Постов области в архиве; один запрос к основной базе."""
+    return ArchiveCount.objects.filter(scope=scope).values_list(
+        'count', flat=True
+    ).first() or 0
+
+
+def inactive_author_ids():
+    """
+    Отключённые пользователи. Пользователи лежат в основной базе, и
+    условие author__is_active до архива не доходит, так что их посты
+    исключаются списком id; таких пользователей мало, пока их данные
+    не удалены фоновой очисткой.
+    """
+    return list(
+        User.objects.filter(is_active=False).values_list('pk', flat=True)
+    )
+
+
+def visible_archived():
+    """Посты архива, видимые в лентах: как Post.objects.visible()."""
+    return Post.objects.using(ARCHIVE_DB).filter(is_hidden=False).exclude(
+        author_id__in=inactive_author_ids()
+    )
+
+
+def archived_posts():
+    """
+    Посты архива для ленты. Авторы и группы лежат в основной базе,
+    поэтому подгружаются prefetch_related, а не JOIN.
+    """
+    return visible_archived().prefetch_related('author', 'group').order_by(
+        '-pub_date'
+    )
+
+
+def add_counts(posts):
+    """
+    Прибавляет перенесённые посты к ArchiveCount. Посты отключённых
+    авторов не учитываются, как в visible_archived() и recount().
+    """
+    counts = Counter(
+        scope
+        for post in posts if post.author.is_active
+        for scope in post_scopes(post)
+    )
+    for scope, count in counts.items():
+        updated = ArchiveCount.objects.filter(scope=scope).update(
+            count=F('count') + count
+        )
+        if not updated:
+            ArchiveCount.objects.create(scope=scope, count=count)
+
+
+def archive_posts(days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE,
+                  pause=ARCHIVE_PAUSE):
+    """
+    Переносит посты старше days дней вместе с комментариями в архив.
+
+    Каждая пачка сначала записывается в архив, затем удаляется из
+    основной базы. Запись идемпотентна, поэтому прерванный перенос
+    можно просто запустить снова.
+
+    Пачка читается уже внутри транзакции основной базы: она начинается
+    с BEGIN IMMEDIATE (см. core.backends.sqlite3), и комментарий,
+    добавленный после чтения, не удалится каскадом мимо архива.
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    moved = 0
+    for pks in batched_pks(
+        Post.objects.filter(pub_date__lt=cutoff, is_hidden=False), batch_size
+    ):
+        with transaction.atomic():
+            posts = list(Post.objects.filter(
+                pk__in=pks, is_hidden=False
+            ).select_related('author'))
+            comments = list(Comment.objects.filter(post_id__in=pks))
+            with transaction.atomic(using=ARCHIVE_DB):
+                # raw-сохранение не перезаписывает даты auto_now_add
+                for obj in posts + comments:
+                    obj.save_base(raw=True, using=ARCHIVE_DB)
+            add_counts(posts)
+            Post.objects.filter(pk__in=[post.pk for post in posts]).delete()
+        moved += len(posts)
+        time.sleep(pause)
+    return moved
+
+
+def purge_archived_posts(queryset, batch_size=ARCHIVE_BATCH_SIZE,
+                         pause=ARCHIVE_PAUSE):
+    """
+    Удаляет посты архива с комментариями и пересчитывает ArchiveCount.
+    Посты удаляются без каскада Django: связанных с ними таблиц основной
+    базы, например рейтингов, в архиве нет, а каскад стал бы искать их
+    там. Поэтому используется закрытый QuerySet._raw_delete, который есть
+    в закреплённом в requirements.txt Django 2.2; сигналы удаления при
+    этом не отправляются.
+    """
+    purged = 0
+    for pks in batched_pks(queryset, batch_size):
+        with transaction.atomic(using=ARCHIVE_DB):
+            Comment.objects.using(ARCHIVE_DB).filter(
+                post_id__in=pks
+            )._raw_delete(ARCHIVE_DB)
+            purged += Post.objects.using(ARCHIVE_DB).filter(
+                pk__in=pks
+            )._raw_delete(ARCHIVE_DB)
+        time.sleep(pause)
+    if purged:
+        recount()
+    return purged
+
+
+def recount():
+    """
+    Пересчитывает ArchiveCount по архиву, например после очистки. Архив
+    читается под блокировкой основной базы, поэтому перенос не добавит
+    к счётчикам посты, уже учтённые пересчётом.
+    """
+    with transaction.atomic():
+        archive = visible_archived().order_by()
+        counts = {ALL_SCOPE: archive.count()}
+        for field in ('author', 'group'):
+            for pk, count in archive.filter(
+                **{f'{field}__isnull': False}
+            ).values_list(f'{field}_id').annotate(count=Count('pk')):
+                counts[f'{field}:{pk}'] = count
+        ArchiveCount.objects.all().delete()
+        ArchiveCount.objects.bulk_create(
+            ArchiveCount(scope=scope, count=count)
+            for scope, count in counts.items()
+            if count
+        )
+    return counts[ALL_SCOPE]
+
+
+class TieredPosts:
+    """
+    Лента из двух частей для Paginator: сначала свежие посты основной
+    базы, за ними более старые посты архива. Архив читается, только
+    когда страница выходит за свежую часть.
+    """
+    ordered = True
+
+    def __init__(self, hot, cold, cold_count):
+        self.hot = hot
+        self.cold = cold
+        self.cold_count = cold_count
+        self.hot_count = None
+
+    def count(self):
+        if self.hot_count is None:
+            self.hot_count = self.hot.count()
+        return self.hot_count + self.cold_count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        hot_count = self.count() - self.cold_count
+        start, stop = index.start or 0, index.stop
+        posts = []
+        if start < hot_count:
+            posts.extend(self.hot[start:min(stop, hot_count)])
+        if stop > hot_count:
+            posts.extend(
+                self.cold[max(start - hot_count, 0):stop - hot_count]
+            )
+        return posts
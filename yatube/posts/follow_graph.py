@@ -0,0 +1,84 @@
+from array import array
+from bisect import bisect_left
+
+from django.db import transaction
+from django.dispatch import Signal
+
+from core.shared_cache import bump_generation, get_generation, shared_cache
+
+from .models import Follow
+from .recommendations import mark_stale
+
+FOLLOWEES_KEY = 'followees:{}:{}'
+FOLLOWEES_GENERATION_KEY = 'followees:generation:{}'
+FOLLOWEES_TIMEOUT = 60 * 60
+# больше стольких авторов лента собирается JOIN-ом, а не списком IN (...)
+FOLLOWEES_IN_LIMIT = 500
+
+# отправляется при любом изменении подписок пользователя, в том числе
+# из follow(), где bulk_create не шлёт post_save
+followees_changed = Signal(providing_args=['user_id'])
+
+
+def get_followees(user_id):
+    """
+    Отсортированный массив id авторов, на которых подписан пользователь.
+    Хранится в общем кеше компактно: 4 байта на подписку.
+    """
+    key = FOLLOWEES_KEY.format(
+        user_id, get_generation(FOLLOWEES_GENERATION_KEY.format(user_id))
+    )
+    cache = shared_cache()
+    packed = cache.get(key)
+    if packed is not None:
+        return array('I', packed)
+    followees = array('I', Follow.objects.filter(
+        user_id=user_id
+    ).order_by('author_id').values_list('author_id', flat=True))
+    # если подписки изменились после чтения, поколение уже другое
+    # и этот ключ никто не прочитает
+    cache.add(key, followees.tobytes(), FOLLOWEES_TIMEOUT)
+    return followees
+
+
+def is_following(user_id, author_id):
+    followees = get_followees(user_id)
+    index = bisect_left(followees, author_id)
+    return index < len(followees) and followees[index] == author_id
+
+
+def invalidate_followees(user_id):
+    bump_generation(FOLLOWEES_GENERATION_KEY.format(user_id))
+
+
+def follows_changed(user_id):
+    """
+    Сбрасывает всё, что зависит от подписок пользователя. Кеши
+    сбрасываются после фиксации транзакции: иначе другой запрос успеет
+    закешировать ещё старые подписки, а при откате сброс будет лишним.
+    """
+    mark_stale(user_id)
+    transaction.on_commit(lambda: notify_followees_changed(user_id))
+
+
+def notify_followees_changed(user_id):
+    invalidate_followees(user_id)
+    followees_changed.send(sender=Follow, user_id=user_id)
+
+
+def follow(user_id, author_id):
+    """
+    Подписка одним INSERT, который не падает на повторной подписке
+    (например, при двойном клике).
+    """
+    Follow.objects.bulk_create(
+        [Follow(user_id=user_id, author_id=author_id)],
+        ignore_conflicts=True
+    )
+    follows_changed(user_id)
+
+
+def unfollow(user_id, author_id):
+    """Отписка; повторная отписка ничего не делает."""
+    Follow.objects.filter(user_id=user_id, author_id=author_id).delete()
+    follows_changed(user_id)
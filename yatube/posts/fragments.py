@@ -0,0 +1,55 @@
+from django.template.loader import render_to_string
+
+from core.fragments import register
+
+from .follow_graph import is_following
+from .models import Follow
+from .recommendations import recommended_authors
+
+
+@register('post_controls')
+def post_controls(request, post_id, author_id):
+    """Ссылки редактирования и удаления в карточке для автора поста."""
+    if str(request.user.pk) != author_id:
+        return ''
+    return render_to_string(
+        'posts/includes/post_controls.html', {'post_id': post_id}
+    )
+
+
+@register('switcher')
+def switcher(request, tab):
+    """Вкладки лент для авторизованного пользователя."""
+    if not request.user.is_authenticated:
+        return ''
+    return render_to_string(
+        'posts/includes/switcher.html', {tab: True}, request=request
+    )
+
+
+@register('follow')
+def follow_button(request, author_id, username):
+    """Число подписчиков автора и кнопка подписки для пользователя."""
+    user = request.user
+    context = {
+        'username': username,
+        'followers': Follow.objects.filter(author_id=author_id).count(),
+        'show_button': str(user.pk) != author_id,
+        'following': user.is_authenticated and is_following(
+            user.pk, int(author_id)
+        ),
+    }
+    return render_to_string(
+        'posts/includes/follow_button.html', context, request=request
+    )
+
+
+@register('who_to_follow')
+def who_to_follow(request):
+    """Рекомендации, на кого подписаться."""
+    if not request.user.is_authenticated:
+        return ''
+    return render_to_string(
+        'posts/includes/who_to_follow.html',
+        {'recommended': recommended_authors(request.user)}
+    )
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from posts.archive import (
+    ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, ARCHIVE_PAUSE, archive_posts,
+    recount
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит старые посты с комментариями в архивную базу пачками. '
+        'Перед первым запуском: migrate --database archive.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS)
+        parser.add_argument(
+            '--batch-size', type=int, default=ARCHIVE_BATCH_SIZE
+        )
+        parser.add_argument('--pause', type=float, default=ARCHIVE_PAUSE)
+        parser.add_argument(
+            '--recount',
+            action='store_true',
+            help='Пересчитать число постов архива по авторам и группам'
+        )
+
+    def handle(self, *args, **options):
+        moved = archive_posts(
+            options['days'], options['batch_size'], options['pause']
+        )
+        self.stdout.write(f'Перенесено в архив постов: {moved}')
+        if options['recount']:
+            self.stdout.write(f'Постов в архиве: {recount()}')
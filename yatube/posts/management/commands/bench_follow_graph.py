@@ -0,0 +1,83 @@
+import pickle
+import random
+import sys
+import time
+from array import array
+from bisect import bisect_left
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает память и скорость проверки подписки для отсортированных '
+        'массивов и множеств на синтетическом графе подписок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--avg-followees', type=int, default=50)
+        parser.add_argument('--lookups', type=int, default=1000000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        users = options['users']
+        graph = [
+            sorted(rng.sample(
+                range(1, users + 1),
+                min(users, int(rng.expovariate(1 / options['avg_followees'])))
+            ))
+            for _ in range(users)
+        ]
+        arrays = [array('I', followees) for followees in graph]
+        sets = [set(followees) for followees in graph]
+        self.stdout.write(
+            f'Пользователей: {users}, подписок: '
+            f'{sum(len(followees) for followees in graph)}'
+        )
+        for name, values, packed in (
+            ('array', arrays, [value.tobytes() for value in arrays]),
+            ('set', sets, sets),
+        ):
+            cached = sum(len(pickle.dumps(value, -1)) for value in packed)
+            resident = sum(
+                sys.getsizeof(value)
+                + (0 if name == 'array' else sum(map(sys.getsizeof, value)))
+                for value in values
+            )
+            self.stdout.write(
+                f'{name}: {cached / users:.0f} байт на пользователя в кеше, '
+                f'{resident / users:.0f} байт в памяти процесса'
+            )
+            dumped = [pickle.dumps(value, -1) for value in packed]
+            start = time.perf_counter()
+            for value in dumped:
+                value = pickle.loads(value)
+                if name == 'array':
+                    array('I', value)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'{name}: {elapsed / users * 1e6:.1f} мкс на чтение из кеша'
+            )
+        queries = [
+            (rng.randrange(users), rng.randint(1, users))
+            for _ in range(options['lookups'])
+        ]
+
+        def array_lookup(user, author):
+            followees = arrays[user]
+            index = bisect_left(followees, author)
+            return index < len(followees) and followees[index] == author
+
+        def set_lookup(user, author):
+            return author in sets[user]
+
+        for name, lookup in (('array', array_lookup), ('set', set_lookup)):
+            start = time.perf_counter()
+            for user, author in queries:
+                lookup(user, author)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'{name}: {elapsed / len(queries) * 1e9:.0f} нс на проверку'
+            )
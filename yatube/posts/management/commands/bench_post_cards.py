@@ -0,0 +1,52 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.utils import timezone
+
+from posts.models import Group, Post, User
+
+FEED_TEMPLATE = (
+    '{% load post_cards %}'
+    '{% for post in posts %}{% post_card post %}{% endfor %}'
+)
+
+
+class Command(BaseCommand):
+    help = 'Измеряет скорость рендеринга карточек постов в ленте.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        group = Group(pk=1, title='Группа', slug='group')
+        posts = []
+        for pk in range(1, options['cards'] + 1):
+            author = User(
+                pk=pk % 50 + 1,
+                username=f'user{pk % 50}',
+                first_name='Имя',
+                last_name='Фамилия'
+            )
+            post = Post(
+                pk=pk,
+                text='Текст поста\n' * 5,
+                author=author,
+                group=group if pk % 2 else None,
+                pub_date=timezone.now()
+            )
+            post.comment_count = pk % 7
+            posts.append(post)
+        feed = engines['django'].from_string(FEED_TEMPLATE)
+        best = None
+        for _ in range(options['repeat']):
+            start = time.perf_counter()
+            feed.render({'posts': posts, 'user': AnonymousUser()})
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        self.stdout.write(
+            f'{len(posts)} карточек за {best * 1000:.1f} мс: '
+            f'{len(posts) / best:.0f} карточек/с'
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import (
+    RECOMMENDATIONS_CHUNK_SIZE, refresh_all, refresh_stale
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рекомендации «кого почитать» для пользователей, '
+        'чьи подписки изменились с прошлого запуска.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true', help='пересчитать для всех'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=RECOMMENDATIONS_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        refresh = refresh_all if options['full'] else refresh_stale
+        refreshed = refresh(options['chunk_size'])
+        self.stdout.write(f'Пересчитано пользователей: {refreshed}')
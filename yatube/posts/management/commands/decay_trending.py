@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import HALF_LIFE_HOURS, decay
+
+
+class Command(BaseCommand):
+    help = (
+        'Применяет затухание к рейтингам популярных постов и групп. '
+        'Запускается периодически, например, раз в час из cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=float, default=1,
+            help='сколько часов прошло с прошлого запуска'
+        )
+        parser.add_argument(
+            '--half-life', type=float, default=HALF_LIFE_HOURS
+        )
+
+    def handle(self, *args, **options):
+        factor = decay(options['hours'], options['half_life'])
+        self.stdout.write(f'Рейтинги умножены на {factor:.4f}')
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.models import Group, Post
+from posts.moderation import (
+    MODERATION_BATCH_SIZE, delete_posts, move_to_group
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты в группу или удаляет их пачками UPDATE/DELETE '
+        'по фильтру.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--author', help='username автора')
+        parser.add_argument('--group', help='slug текущей группы')
+        parser.add_argument('--contains', help='подстрока текста поста')
+        parser.add_argument('--before', help='опубликованы до даты')
+        action = parser.add_mutually_exclusive_group(required=True)
+        action.add_argument('--move-to', help='slug новой группы')
+        action.add_argument(
+            '--clear-group', action='store_true', help='убрать из групп'
+        )
+        action.add_argument(
+            '--delete', action='store_true', help='удалить посты'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=MODERATION_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.all()
+        if options['author']:
+            queryset = queryset.filter(author__username=options['author'])
+        if options['group']:
+            queryset = queryset.filter(group__slug=options['group'])
+        if options['contains']:
+            queryset = queryset.filter(text__contains=options['contains'])
+        if options['before']:
+            queryset = queryset.filter(pub_date__lt=options['before'])
+        batch_size = options['batch_size']
+        if options['delete']:
+            deleted = delete_posts(queryset, batch_size)
+            self.stdout.write(f'Удалено постов: {deleted}')
+            return
+        group = None
+        if options['move_to']:
+            try:
+                group = Group.objects.get(slug=options['move_to'])
+            except Group.DoesNotExist:
+                raise CommandError(f'Группа {options["move_to"]} не найдена')
+        moved = move_to_group(queryset, group, batch_size)
+        self.stdout.write(f'Перенесено постов: {moved}')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.purge import PURGE_BATCH_SIZE, PURGE_PAUSE, purge
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет скрытые посты и данные удалённых пользователей небольшими '
+        'пачками. Запускается периодически в фоне.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=PURGE_BATCH_SIZE
+        )
+        parser.add_argument('--pause', type=float, default=PURGE_PAUSE)
+
+    def handle(self, *args, **options):
+        posts, users = purge(options['batch_size'], options['pause'])
+        self.stdout.write(
+            f'Удалено постов: {posts}, пользователей: {users}'
+        )
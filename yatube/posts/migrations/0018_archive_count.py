@@ -0,0 +1,20 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_post_views'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveCount',
+            fields=[
+                ('scope', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Область')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Постов в архиве')),
+            ],
+        ),
+    ]
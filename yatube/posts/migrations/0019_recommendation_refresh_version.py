@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_archive_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recommendationrefresh',
+            name='version',
+            field=models.PositiveIntegerField(default=0, verbose_name='Версия'),
+        ),
+    ]
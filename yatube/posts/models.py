@@ -5,6 +5,12 @@ CHARS_IN_POST_STR = 15
 User = get_user_model()
 
 
+class PostQuerySet(models.QuerySet):
+    def visible(self):
+        """Посты, не скрытые на удаление, от активных авторов."""
+        return self.filter(is_hidden=False, author__is_active=True)
+
+
 class Post(models.Model):
     text = models.TextField(
         'Текст поста',
@@ -12,7 +18,8 @@ class Post(models.Model):
     )
     pub_date = models.DateTimeField(
         'Дата публикации',
-        auto_now_add=True
+        auto_now_add=True,
+        db_index=True
     )
     author = models.ForeignKey(
         User,
@@ -33,11 +40,29 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    is_hidden = models.BooleanField(
+        'Скрыт',
+        default=False,
+        help_text='Пост удалён и ждёт фоновой очистки'
+    )
+    views = models.PositiveIntegerField(
+        'Просмотры',
+        default=0,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = [
+            models.Index(
+                fields=['is_hidden', '-pub_date'],
+                name='post_visible_pub_date'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:CHARS_IN_POST_STR]
@@ -69,9 +94,18 @@ class Comment(models.Model):
     )
     created = models.DateTimeField(
         'Дата публикации',
-        auto_now_add=True
+        auto_now_add=True,
+        db_index=True
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['post', 'created'],
+                name='comment_post_created'
+            ),
+        ]
+
     def __str__(self):
         return self.text
 
@@ -99,3 +133,91 @@ class Follow(models.Model):
                 name='author_cannot_self_follow'
             ),
         ]
+
+
+class Recommendation(models.Model):
+    """Предвычисленная рекомендация автора для подписки."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    score = models.FloatField('Оценка')
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-score'],
+                name='recommendation_user_score'
+            ),
+        ]
+
+
+class RecommendationRefresh(models.Model):
+    """Пользователь, чьи подписки изменились после расчёта рекомендаций."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+',
+    )
+    # растёт при каждом изменении: отметка снимается, только если
+    # за время пересчёта подписки больше не менялись
+    version = models.PositiveIntegerField('Версия', default=0)
+
+
+class PostScore(models.Model):
+    """Рейтинг поста по недавней активности, затухающий со временем."""
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score',
+    )
+    score = models.FloatField('Рейтинг', default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score'], name='post_score'),
+        ]
+
+
+class GroupScore(models.Model):
+    """Рейтинг активности группы, затухающий со временем."""
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score',
+    )
+    score = models.FloatField('Рейтинг', default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score'], name='group_score'),
+        ]
+
+
+class UserPurge(models.Model):
+    """Пользователь, удалённый и ждущий фоновой очистки его данных."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+',
+    )
+
+
+class ArchiveCount(models.Model):
+    """
+    Число постов в архивной базе по областям ленты: 'all',
+    'author:<id>', 'group:<id>'. Хранится в основной базе, чтобы лента
+    обращалась к архиву, только когда в нём что-то есть.
+    """
+    scope = models.CharField('Область', max_length=50, primary_key=True)
+    count = models.PositiveIntegerField('Постов в архиве', default=0)
@@ -0,0 +1,50 @@
+from django.db import transaction
+from django.dispatch import Signal
+
+from .models import Post
+
+MODERATION_BATCH_SIZE = 500
+
+# отправляется один раз на пачку постов, изменённых или удалённых
+# массовой операцией, чтобы обновить зависящие от них кеши и счётчики
+posts_batch_changed = Signal(providing_args=['pks', 'deleted'])
+
+
+def batched_pks(queryset, batch_size=MODERATION_BATCH_SIZE):
+    """Первичные ключи queryset пачками в порядке возрастания."""
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = 0
+    while True:
+        pks = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+def move_to_group(queryset, group, batch_size=MODERATION_BATCH_SIZE):
+    """Переносит посты в группу (или убирает из групп) пачками UPDATE."""
+    moved = 0
+    for pks in batched_pks(queryset, batch_size):
+        with transaction.atomic():
+            moved += Post.objects.filter(pk__in=pks).update(group=group)
+        posts_batch_changed.send(sender=Post, pks=pks, deleted=False)
+    return moved
+
+
+def delete_posts(queryset, batch_size=MODERATION_BATCH_SIZE):
+    """
+    Удаляет посты пачками, каждую в отдельной короткой транзакции.
+    Комментарии и рейтинги удаляются каскадом Django с сигналами на каждую
+    строку; posts_batch_changed дополнительно отправляется один раз на
+    пачку для кешей и счётчиков, которым нужен весь список.
+    """
+    deleted = 0
+    for pks in batched_pks(queryset, batch_size):
+        with transaction.atomic(using=queryset.db):
+            _, per_model = Post.objects.using(queryset.db).filter(
+                pk__in=pks
+            ).delete()
+        deleted += per_model.get(Post._meta.label, 0)
+        posts_batch_changed.send(sender=Post, pks=pks, deleted=True)
+    return deleted
@@ -0,0 +1,104 @@
+import base64
+import binascii
+from collections import defaultdict
+from datetime import datetime
+
+from django.core.paginator import Paginator
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Q
+
+from .models import Comment
+
+COMMENTS_PER_PAGE = 20
+
+
+def add_comment_counts(posts):
+    """
+    Проставляет постам comment_count одним запросом на базу по id постов,
+    а не JOIN и GROUP BY по всей таблице комментариев.
+    """
+    pks = defaultdict(list)
+    for post in posts:
+        pks[post._state.db].append(post.pk)
+    counts = {}
+    for using, post_ids in pks.items():
+        counts.update(
+            Comment.objects.using(using).filter(
+                post_id__in=post_ids
+            ).order_by().values_list('post_id').annotate(Count('pk'))
+        )
+    for post in posts:
+        post.comment_count = counts.get(post.pk, 0)
+    return posts
+
+
+class CommentCounted:
+    """Посты страницы; комментарии считаются, когда страницу читают."""
+
+    def __init__(self, posts):
+        self.posts = posts
+
+    def __len__(self):
+        return len(self.posts)
+
+    def __iter__(self):
+        return iter(add_comment_counts(list(self.posts)))
+
+
+class FeedPaginator(Paginator):
+    """
+    Paginator ленты: COUNT идёт по запросу без агрегатов, а комментарии
+    считаются только для постов страницы.
+    """
+
+    def _get_page(self, object_list, *args, **kwargs):
+        return super()._get_page(
+            CommentCounted(object_list), *args, **kwargs
+        )
+
+
+def make_cursor(moment, pk):
+    """Курсор на пару (время, id) в url-safe base64."""
+    raw = f'{moment.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def encode_cursor(comment):
+    """Курсор на комментарий: его (created, id)."""
+    return make_cursor(comment.created, comment.pk)
+
+
+def decode_cursor(cursor):
+    """Пара (created, id) из курсора; ValueError для испорченного курсора."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created, pk = raw.split('|')
+        return datetime.fromisoformat(created), int(pk)
+    except (TypeError, UnicodeError, binascii.Error) as error:
+        raise ValueError(cursor) from error
+
+
+def comments_page(post_id, cursor=None, per_page=COMMENTS_PER_PAGE,
+                  using=DEFAULT_DB_ALIAS):
+    """
+    Страница комментариев поста после курсора по индексу (post, created)
+    и курсор следующей страницы (None, если страница последняя).
+    """
+    comments = Comment.objects.using(using).filter(
+        post_id=post_id
+    ).order_by('created', 'pk')
+    if using == DEFAULT_DB_ALIAS:
+        comments = comments.select_related('author')
+    else:
+        # авторы комментариев архива лежат в основной базе
+        comments = comments.prefetch_related('author')
+    if cursor:
+        created, pk = decode_cursor(cursor)
+        comments = comments.filter(
+            Q(created__gt=created) | Q(created=created, pk__gt=pk)
+        )
+    page = list(comments[:per_page + 1])
+    if len(page) <= per_page:
+        return page, None
+    page = page[:per_page]
+    return page, encode_cursor(page[-1])
@@ -0,0 +1,107 @@
+import time
+
+from django.db import transaction
+from django.db.models import Q
+
+from core.backends.auth import forget_user
+
+from .archive import (
+    ALL_SCOPE, archived_count, purge_archived_posts, recount
+)
+from .models import Comment, Follow, Post, User, UserPurge
+from .moderation import batched_pks, posts_batch_changed
+from .routers import ARCHIVE_DB
+
+PURGE_BATCH_SIZE = 500
+# пауза между пачками, чтобы другие процессы успевали записывать
+PURGE_PAUSE = 0.05
+
+
+def hide_post(post_id):
+    """Мгновенно скрывает пост; комментарии удалит фоновая очистка."""
+    Post.objects.filter(pk=post_id).update(is_hidden=True)
+    posts_batch_changed.send(sender=Post, pks=[post_id], deleted=False)
+
+
+def schedule_user_deletion(user_id):
+    """Отключает пользователя и ставит его данные в очередь на очистку."""
+    with transaction.atomic():
+        User.objects.filter(pk=user_id).update(is_active=False)
+        UserPurge.objects.bulk_create(
+            [UserPurge(user_id=user_id)], ignore_conflicts=True
+        )
+    # update() не шлёт post_save, кеш пользователя сбрасывается явно
+    forget_user(user_id)
+    if archived_count(f'author:{user_id}'):
+        # архивные посты отключённого автора выпадают из лент
+        recount()
+    posts_batch_changed.send(
+        sender=Post,
+        pks=list(
+            Post.objects.filter(author_id=user_id).values_list('pk', flat=True)
+        ),
+        deleted=False
+    )
+
+
+def delete_batched(queryset, batch_size=PURGE_BATCH_SIZE, pause=PURGE_PAUSE):
+    """Удаляет строки queryset пачками, каждая в короткой транзакции."""
+    model = queryset.model
+    deleted = 0
+    for pks in batched_pks(queryset, batch_size):
+        with transaction.atomic(using=queryset.db):
+            deleted += model.objects.using(queryset.db).filter(
+                pk__in=pks
+            ).delete()[1].get(model._meta.label, 0)
+        time.sleep(pause)
+    return deleted
+
+
+def purge_posts(queryset, batch_size=PURGE_BATCH_SIZE, pause=PURGE_PAUSE):
+    """Удаляет посты: сначала их комментарии пачками, затем сами посты."""
+    purged = 0
+    for pks in batched_pks(queryset, batch_size):
+        delete_batched(
+            Comment.objects.filter(post_id__in=pks), batch_size, pause
+        )
+        purged += delete_batched(
+            Post.objects.filter(pk__in=pks), batch_size, pause
+        )
+    return purged
+
+
+def purge_user(user_id, batch_size=PURGE_BATCH_SIZE, pause=PURGE_PAUSE):
+    """Удаляет данные пользователя пачками, а затем его самого."""
+    delete_batched(
+        Follow.objects.filter(Q(user_id=user_id) | Q(author_id=user_id)),
+        batch_size, pause
+    )
+    delete_batched(
+        Comment.objects.filter(author_id=user_id), batch_size, pause
+    )
+    purge_posts(Post.objects.filter(author_id=user_id), batch_size, pause)
+    if archived_count(ALL_SCOPE):
+        delete_batched(
+            Comment.objects.using(ARCHIVE_DB).filter(author_id=user_id),
+            batch_size,
+            pause
+        )
+        purge_archived_posts(
+            Post.objects.using(ARCHIVE_DB).filter(author_id=user_id),
+            batch_size,
+            pause
+        )
+    with transaction.atomic():
+        User.objects.filter(pk=user_id).delete()
+
+
+def purge(batch_size=PURGE_BATCH_SIZE, pause=PURGE_PAUSE):
+    """Очищает скрытые посты и удалённых пользователей."""
+    posts = purge_posts(
+        Post.objects.filter(is_hidden=True), batch_size, pause
+    )
+    users = 0
+    for user_id in list(UserPurge.objects.values_list('user_id', flat=True)):
+        purge_user(user_id, batch_size, pause)
+        users += 1
+    return posts, users
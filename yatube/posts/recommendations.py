@@ -0,0 +1,212 @@
+import heapq
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import connection, transaction
+from django.db.models import F, Q
+
+from .models import Follow, Recommendation, RecommendationRefresh, User
+
+RECOMMENDATIONS_PER_USER = 10
+RECOMMENDATIONS_CHUNK_SIZE = 100
+# вес пути «подписки моих подписок» и совместной подписки
+FRIEND_OF_FRIEND_WEIGHT = 1.0
+CO_FOLLOW_WEIGHT = 0.5
+# сколько подписчиков популярного автора учитывать для совместных подписок
+CO_FOLLOWERS_SAMPLE = 20
+# и сколько всего подписчиков на пачку пользователей: их подписки
+# загружаются целиком
+CO_FOLLOWERS_PER_CHUNK = 2000
+# не больше стольких параметров в одном IN (...)
+IN_CLAUSE_LIMIT = 900
+# не больше стольких SELECT в одном UNION ALL (предел SQLite — 500)
+UNION_LIMIT = 400
+
+
+def mark_stale(user_id):
+    """Ставит пользователя в очередь на пересчёт рекомендаций."""
+    updated = RecommendationRefresh.objects.filter(user_id=user_id).update(
+        version=F('version') + 1
+    )
+    if not updated:
+        RecommendationRefresh.objects.bulk_create(
+            [RecommendationRefresh(user_id=user_id)], ignore_conflicts=True
+        )
+
+
+def recommended_authors(user, limit=5):
+    """
+    Рекомендации пользователя одним запросом по индексу (user, -score),
+    без авторов, на которых он подписался или которых отключили после
+    расчёта.
+    """
+    # follow_graph сам импортирует этот модуль
+    from .follow_graph import is_following
+
+    return [
+        recommendation.author
+        for recommendation in Recommendation.objects.filter(
+            user=user, author__is_active=True
+        ).select_related('author').order_by('-score')
+        if not is_following(user.pk, recommendation.author_id)
+    ][:limit]
+
+
+def slices(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), IN_CLAUSE_LIMIT):
+        yield ids[start:start + IN_CLAUSE_LIMIT]
+
+
+def followees_of(user_ids):
+    """Активные авторы, на которых подписаны пользователи."""
+    followees = defaultdict(set)
+    for ids in slices(user_ids):
+        for user_id, author_id in Follow.objects.filter(
+            user_id__in=ids, author__is_active=True
+        ).values_list('user_id', 'author_id'):
+            followees[user_id].add(author_id)
+    return followees
+
+
+def followers_of(author_ids, sample=CO_FOLLOWERS_SAMPLE):
+    """
+    Последние sample подписчиков каждого автора. LIMIT на автора стоит
+    в SQL, так что популярный автор не тянет всех своих подписчиков.
+    """
+    table = connection.ops.quote_name(Follow._meta.db_table)
+    select = (
+        f'SELECT * FROM (SELECT user_id, author_id FROM {table} '
+        f'WHERE author_id = %s ORDER BY id DESC LIMIT %s)'
+    )
+    author_ids = list(author_ids)
+    followers = defaultdict(list)
+    for start in range(0, len(author_ids), UNION_LIMIT):
+        ids = author_ids[start:start + UNION_LIMIT]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                ' UNION ALL '.join([select] * len(ids)),
+                [param for author_id in ids for param in (author_id, sample)]
+            )
+            for user_id, author_id in cursor.fetchall():
+                followers[author_id].append(user_id)
+    return followers
+
+
+def compute_chunk(user_ids, limit=RECOMMENDATIONS_PER_USER):
+    """Лучшие рекомендации для пачки пользователей."""
+    followees = followees_of(user_ids)
+    direct = set().union(*followees.values())
+    second = followees_of(direct)
+    # подписчиков на автора тем меньше, чем больше авторов в пачке, так
+    # что всего их не больше CO_FOLLOWERS_PER_CHUNK
+    sample = min(
+        CO_FOLLOWERS_SAMPLE,
+        max(1, CO_FOLLOWERS_PER_CHUNK // max(len(direct), 1))
+    )
+    co_followers = followers_of(
+        sorted(direct)[:CO_FOLLOWERS_PER_CHUNK], sample
+    )
+    third = followees_of(
+        set().union(*co_followers.values()) - set(user_ids)
+    )
+    result = {}
+    for user_id in user_ids:
+        own = followees.get(user_id, set())
+        scores = Counter()
+        for author_id in own:
+            for candidate in second.get(author_id, ()):
+                scores[candidate] += FRIEND_OF_FRIEND_WEIGHT
+            for follower in co_followers.get(author_id, ()):
+                for candidate in third.get(follower, ()):
+                    scores[candidate] += CO_FOLLOW_WEIGHT
+        for excluded in own | {user_id}:
+            scores.pop(excluded, None)
+        result[user_id] = heapq.nlargest(
+            limit, scores.items(), key=lambda item: item[1]
+        )
+    return result
+
+
+def store_chunk(recommendations):
+    with transaction.atomic():
+        Recommendation.objects.filter(
+            user_id__in=list(recommendations)
+        ).delete()
+        Recommendation.objects.bulk_create(
+            Recommendation(user_id=user_id, author_id=author_id, score=score)
+            for user_id, top in recommendations.items()
+            for author_id, score in top
+        )
+
+
+def refresh_users(user_ids, chunk_size=RECOMMENDATIONS_CHUNK_SIZE):
+    user_ids = sorted(user_ids)
+    for start in range(0, len(user_ids), chunk_size):
+        store_chunk(compute_chunk(user_ids[start:start + chunk_size]))
+    return len(user_ids)
+
+
+def clear_marks(marks):
+    """
+    Снимает отметки (user_id, version), прочитанные до пересчёта; отметки,
+    обновлённые за это время, остаются до следующего запуска.
+    """
+    step = RECOMMENDATIONS_CHUNK_SIZE
+    for start in range(0, len(marks), step):
+        RecommendationRefresh.objects.filter(reduce(or_, (
+            Q(user_id=user_id, version=version)
+            for user_id, version in marks[start:start + step]
+        ))).delete()
+
+
+def refresh_all(chunk_size=RECOMMENDATIONS_CHUNK_SIZE):
+    """Полный пересчёт для всех пользователей пачками по id."""
+    marks = list(
+        RecommendationRefresh.objects.values_list('user_id', 'version')
+    )
+    refreshed = 0
+    last_pk = 0
+    users = User.objects.order_by('pk').values_list('pk', flat=True)
+    while True:
+        user_ids = list(users.filter(pk__gt=last_pk)[:chunk_size])
+        if not user_ids:
+            break
+        store_chunk(compute_chunk(user_ids))
+        refreshed += len(user_ids)
+        last_pk = user_ids[-1]
+    if marks:
+        clear_marks(marks)
+    return refreshed
+
+
+def refresh_stale(chunk_size=RECOMMENDATIONS_CHUNK_SIZE):
+    """
+    Пересчёт только для пользователей, чьи подписки изменились, и их
+    подписчиков: у последних меняются «подписки подписок». Отметки
+    снимаются после записи рекомендаций, поэтому прерванный пересчёт
+    продолжается при следующем запуске.
+    """
+    refreshed = 0
+    last_pk = 0
+    while True:
+        marks = list(
+            RecommendationRefresh.objects.filter(
+                user_id__gt=last_pk
+            ).order_by('user_id').values_list('user_id', 'version')[
+                :chunk_size
+            ]
+        )
+        if not marks:
+            return refreshed
+        changed = [user_id for user_id, _ in marks]
+        affected = set(changed).union(*(
+            Follow.objects.filter(author_id__in=ids).values_list(
+                'user_id', flat=True
+            )
+            for ids in slices(changed)
+        ))
+        refreshed += refresh_users(affected, chunk_size)
+        clear_marks(marks)
+        last_pk = changed[-1]
@@ -0,0 +1,33 @@
+ARCHIVE_DB = 'archive'
+# в архиве хранятся только старые посты и их комментарии
+ARCHIVED_MODELS = {'post', 'comment'}
+
+
+def is_archived_model(model):
+    return (
+        model._meta.app_label == 'posts'
+        and model._meta.model_name in ARCHIVED_MODELS
+    )
+
+
+class ArchiveRouter:
+    """
+    Посты и комментарии читаются из базы, указанной через using() или
+    базы связанного объекта; всё остальное, в том числе авторы и группы
+    архивных постов, — только из основной базы.
+    """
+
+    def db_for_read(self, model, **hints):
+        if is_archived_model(model):
+            return None
+        return 'default'
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db != ARCHIVE_DB:
+            return None
+        return app_label == 'posts' and model_name in ARCHIVED_MODELS
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.page_cache import invalidate_pages
+
+from .follow_graph import follows_changed
+from .models import Comment, Follow, Group, Post
+from .moderation import posts_batch_changed
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follow_changed(sender, instance, **kwargs):
+    """Сбрасывает зависящее от подписок при подписке и отписке."""
+    follows_changed(instance.user_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(posts_batch_changed, sender=Post)
+def pages_changed(sender, **kwargs):
+    """
+    Новые, изменённые и скрытые посты и число комментариев сразу видны
+    в закешированных лентах. Пост удаляется из базы уже скрытым
+    (фоновой очисткой или из админки через posts_batch_changed), поэтому
+    post_delete поста не сбрасывает страницы: одиночное удаление видно
+    через PAGE_CACHE_TIMEOUT.
+    """
+    invalidate_pages()
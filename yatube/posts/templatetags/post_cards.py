@@ -0,0 +1,48 @@
+from urllib.parse import quote
+
+from django import template
+from django.urls import reverse
+from django.utils.http import RFC3986_SUBDELIMS
+
+register = template.Library()
+
+URL_SENTINEL = '4815162342'
+# символы, которые reverse() оставляет в аргументах без экранирования
+URL_SAFE_CHARS = RFC3986_SUBDELIMS + '/~:@'
+
+
+class CardUrls:
+    """
+    Развороты URL карточек постов, вычисленные один раз на страницу:
+    каждый URL разворачивается с заглушкой, а затем для каждой карточки
+    заглушка заменяется на аргумент.
+    """
+
+    def __init__(self):
+        self.patterns = {}
+
+    def reverse(self, name, arg):
+        if name not in self.patterns:
+            url = reverse(name, args=[URL_SENTINEL])
+            self.patterns[name] = url.split(URL_SENTINEL, 1)
+        prefix, suffix = self.patterns[name]
+        return prefix + quote(str(arg), safe=URL_SAFE_CHARS) + suffix
+
+
+@register.inclusion_tag('posts/includes/post_list.html', takes_context=True)
+def post_card(context, post):
+    """Карточка поста в ленте."""
+    urls = context.render_context.get(CardUrls)
+    if urls is None:
+        urls = context.render_context[CardUrls] = CardUrls()
+    author = post.author
+    card = {
+        'post': post,
+        'group': context.get('group'),
+        'author_name': author.get_full_name(),
+        'profile_url': urls.reverse('posts:profile', author.username),
+        'detail_url': urls.reverse('posts:post_detail', post.pk),
+    }
+    if post.group_id is not None:
+        card['group_url'] = urls.reverse('posts:group_list', post.group.slug)
+    return card
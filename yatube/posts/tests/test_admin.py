@@ -0,0 +1,125 @@
+from unittest import mock
+
+from core.paginator import EstimatedCountPaginator
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post, User, UserPurge
+
+
+class TestAdminChangelists(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@test.tt', password='password'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Group.objects.create(
+            title='Другая группа',
+            slug='another-slug',
+            description='Другое описание',
+        )
+
+    def setUp(self):
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def create_rows(self, count):
+        for index in range(count):
+            author = User.objects.create_user(
+                username=f'user{User.objects.count()}'
+            )
+            post = Post.objects.create(
+                text='Тестовый пост', author=author, group=self.group
+            )
+            Comment.objects.create(
+                text='Тестовый комментарий', author=author, post=post
+            )
+            Follow.objects.create(user=author, author=self.admin)
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.admin_client.get(url)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Число запросов changelist не зависит от числа строк."""
+        # из них два запроса — сессия и пользователь сессии
+        expected = {
+            reverse('admin:posts_post_changelist'): 12,
+            reverse('admin:posts_comment_changelist'): 8,
+            reverse('admin:posts_follow_changelist'): 8,
+        }
+        for rows in (2, 10):
+            self.create_rows(rows)
+            for url, queries in expected.items():
+                with self.subTest(url=url, rows=rows):
+                    self.assertEqual(self.changelist_queries(url), queries)
+
+    @mock.patch('core.paginator.ESTIMATE_THRESHOLD', 1)
+    def test_paginator_estimates_only_unfiltered_tables(self):
+        """Оценка числа строк используется только без фильтров."""
+        self.create_rows(3)
+        Post.objects.order_by('pk').first().delete()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        Post.objects.create(text='Тестовый пост', author=self.admin)
+        paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+        # оценка из sqlite_stat1 на момент ANALYZE
+        self.assertEqual(paginator.count, 2)
+        paginator = EstimatedCountPaginator(
+            Post.objects.filter(group=self.group), 10
+        )
+        self.assertEqual(paginator.count, 2)
+
+    @mock.patch('core.paginator.ESTIMATE_THRESHOLD', 1)
+    def test_paginator_without_stats_counts_sparse_tables(self):
+        """Без статистики Max(pk) берётся только для плотных таблиц."""
+        self.create_rows(3)
+        Post.objects.order_by('pk').first().delete()
+        paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+        self.assertEqual(paginator.count, 2)
+        paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+        paginator.dense = True
+        self.assertEqual(
+            paginator.count, Post.objects.order_by('-pk').first().pk
+        )
+
+
+class TestUserAdmin(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username='admin', email='admin@test.tt', password='password'
+        )
+        self.user = User.objects.create_user(username='user')
+        Post.objects.create(text='Тестовый пост', author=self.user)
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def test_bulk_delete_action_removed(self):
+        """Массового каскадного удаления пользователей нет."""
+        response = self.admin_client.get(
+            reverse('admin:auth_user_changelist')
+        )
+        actions = dict(response.context['action_form'].fields[
+            'action'
+        ].choices)
+        self.assertNotIn('delete_selected', actions)
+        self.assertIn('schedule_deletion_action', actions)
+
+    def test_delete_view_schedules_deletion(self):
+        """Удаление со страницы пользователя только ставит его в очередь."""
+        self.admin_client.post(
+            reverse('admin:auth_user_delete', args=[self.user.pk]),
+            data={'post': 'yes'}
+        )
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertTrue(UserPurge.objects.filter(user=self.user).exists())
+        self.assertTrue(Post.objects.filter(author=self.user).exists())
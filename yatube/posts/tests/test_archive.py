@@ -0,0 +1,143 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from posts.archive import archived_count, archived_posts, recount
+from posts.models import Comment, Group, Post, User
+from posts.purge import purge_user, schedule_user_deletion
+from posts.routers import ARCHIVE_DB
+from posts.views import POSTS_PER_PAGE
+
+
+class TestArchive(TestCase):
+    databases = {'default', ARCHIVE_DB}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def setUp(self):
+        self.old_posts = Post.objects.bulk_create(
+            Post(text=f'Старый пост {number}', author=self.author)
+            for number in range(POSTS_PER_PAGE)
+        )
+        Post.objects.update(
+            pub_date=timezone.now() - timedelta(days=400), group=self.group
+        )
+        self.old_post = Post.objects.first()
+        Comment.objects.create(
+            text='Комментарий', author=self.reader, post=self.old_post
+        )
+        self.new_posts = [
+            Post.objects.create(
+                text=f'Новый пост {number}', author=self.author
+            )
+            for number in range(3)
+        ]
+        call_command(
+            'archive_posts', days=365, batch_size=4, pause=0,
+            stdout=StringIO()
+        )
+
+    def test_old_posts_moved(self):
+        """Старые посты с комментариями перенесены в архив."""
+        self.assertEqual(Post.objects.count(), len(self.new_posts))
+        self.assertEqual(
+            Post.objects.using(ARCHIVE_DB).count(), len(self.old_posts)
+        )
+        archived = Post.objects.using(ARCHIVE_DB).get(pk=self.old_post.pk)
+        self.assertEqual(archived.pub_date, self.old_post.pub_date)
+        self.assertEqual(archived.comments.count(), 1)
+        self.assertEqual(archived_count('all'), len(self.old_posts))
+        self.assertEqual(
+            archived_count(f'group:{self.group.pk}'), len(self.old_posts)
+        )
+
+    def test_feeds_continue_into_archive(self):
+        """Листание ленты после свежих постов продолжается архивом."""
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:profile', args=[self.author.username]),
+        ):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                self.assertEqual(
+                    first.context['page_obj'].paginator.count,
+                    len(self.new_posts) + len(self.old_posts)
+                )
+                second = self.client.get(url, {'page': 2})
+                self.assertEqual(
+                    [post.text for post in second.context['page_obj']],
+                    [f'Старый пост {number}' for number in range(7, 10)]
+                )
+        response = self.client.get(
+            reverse('posts:group_list', args=[self.group.slug])
+        )
+        self.assertEqual(
+            len(response.context['page_obj']), len(self.old_posts)
+        )
+
+    def test_archived_post_detail(self):
+        """Архивный пост открывается только для чтения."""
+        client = Client()
+        client.force_login(self.author)
+        response = client.get(
+            reverse('posts:post_detail', args=[self.old_post.pk])
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.context['archived'])
+        self.assertEqual(response.context['comment_count'], 1)
+        self.assertEqual(
+            response.context['comments'][0].author, self.reader
+        )
+        self.assertNotContains(
+            response, reverse('posts:post_edit', args=[self.old_post.pk])
+        )
+
+    def test_purge_user_removes_archived_posts(self):
+        purge_user(self.author.pk, pause=0)
+        self.assertFalse(Post.objects.using(ARCHIVE_DB).exists())
+        self.assertEqual(archived_count('all'), 0)
+
+    def test_inactive_author_hidden_from_archive(self):
+        """Архивные посты отключённого автора выпадают из лент и счётчиков."""
+        schedule_user_deletion(self.author.pk)
+        self.assertFalse(archived_posts().exists())
+        self.assertEqual(archived_count('all'), 0)
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response.context['page_obj'].paginator.count, 0)
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.old_post.pk])
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_inactive_author_not_counted_on_archive(self):
+        """Перенос не учитывает посты отключённых авторов, как и лента."""
+        inactive = User.objects.create_user(
+            username='inactive', is_active=False
+        )
+        Post.objects.filter(pk=self.new_posts[0].pk).update(
+            author=inactive, pub_date=timezone.now() - timedelta(days=400)
+        )
+        call_command('archive_posts', days=365, pause=0, stdout=StringIO())
+        self.assertEqual(
+            archived_count('all'), archived_posts().count()
+        )
+        self.assertEqual(archived_count(f'author:{inactive.pk}'), 0)
+
+    def test_recount_matches_archive(self):
+        """Пересчёт восстанавливает счётчики по архиву."""
+        recount()
+        self.assertEqual(archived_count('all'), len(self.old_posts))
+        self.assertEqual(
+            archived_count(f'author:{self.author.pk}'), len(self.old_posts)
+        )
@@ -1,7 +1,12 @@
+from core.shared_cache import shared_cache
+from django.contrib.messages import constants
+from django.contrib.messages.storage.base import Message
+from django.contrib.messages.storage.cookie import CookieStorage
 from django.core.cache import cache
-from django.test import Client, TestCase
-from django.urls import reverse_lazy
-from posts.models import Post, User
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse, reverse_lazy
+from posts.follow_graph import follow
+from posts.models import Comment, Post, User
 
 
 class TestCache(TestCase):
@@ -20,6 +25,7 @@ class TestCache(TestCase):
     def setUp(self):
         self.guest_client = Client()
         cache.clear()
+        shared_cache().clear()
 
     def test_index_cache(self):
         """"
@@ -34,3 +40,78 @@ class TestCache(TestCase):
         cache.clear()
         response = self.guest_client.get(self.index_url)
         self.assertNotEqual(response.content, content)
+
+    def test_cached_page_served_without_queries(self):
+        """Повторный запрос ленты не обращается к базе, даже за COUNT."""
+        self.guest_client.get(self.index_url)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(self.index_url)
+        self.assertContains(response, 'Тестовый пост')
+
+    def test_new_post_shown_immediately(self):
+        """Новый пост сразу сбрасывает закешированные ленты."""
+        self.guest_client.get(self.index_url)
+        Post.objects.create(text='Свежий пост', author=self.author)
+        response = self.guest_client.get(self.index_url)
+        self.assertContains(response, 'Свежий пост')
+
+    def test_user_parts_stitched_into_cached_profile(self):
+        """
+        Шапка, вкладки, подписка и число подписчиков на закешированной
+        странице свои у каждого пользователя.
+        """
+        url = reverse('posts:profile', args=[self.author.username])
+        user = User.objects.create_user(username='reader')
+        client = Client()
+        client.force_login(user)
+        guest_content = self.guest_client.get(url).content.decode()
+        self.assertIn('Войти', guest_content)
+        self.assertNotIn('reader', guest_content)
+        follow(user.pk, self.author.pk)
+        response = client.get(url)
+        # представление не запускалось: страница из кеша
+        self.assertNotIn('page_obj', response.context)
+        content = response.content.decode()
+        self.assertIn('Пользователь: <b>reader</b>', content)
+        self.assertIn('Отписаться', content)
+        self.assertIn('<span id="followers-count">1</span>', content)
+        content = client.get(self.index_url).content.decode()
+        self.assertIn('Избранные авторы', content)
+        self.assertNotIn(
+            'Избранные авторы',
+            self.guest_client.get(self.index_url).content.decode()
+        )
+
+    def test_new_comment_shown_immediately(self):
+        """Новый комментарий сразу меняет их число в закешированной ленте."""
+        post = Post.objects.create(text='Обсуждаемый пост', author=self.author)
+        self.guest_client.get(self.index_url)
+        Comment.objects.create(
+            text='Комментарий', author=self.author, post=post
+        )
+        self.assertContains(
+            self.guest_client.get(self.index_url), '<small>(1)</small>'
+        )
+
+    @override_settings(PAGE_CACHE_ALIAS='shared')
+    def test_pages_stored_in_configured_cache(self):
+        """Страница лежит в кеше PAGE_CACHE_ALIAS, общем для воркеров."""
+        self.guest_client.get(self.index_url)
+        cache.clear()
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(self.index_url)
+        self.assertContains(response, 'Тестовый пост')
+
+    def test_message_shown_once(self):
+        """Сообщение на закешированной странице показывается один раз."""
+        storage = CookieStorage(RequestFactory().get('/'))
+        self.guest_client.cookies[storage.cookie_name] = storage._encode(
+            [Message(constants.INFO, 'Пост опубликован')]
+        )
+        Client().get(self.index_url)
+        self.assertContains(
+            self.guest_client.get(self.index_url), 'Пост опубликован'
+        )
+        self.assertNotContains(
+            self.guest_client.get(self.index_url), 'Пост опубликован'
+        )
@@ -1,6 +1,9 @@
+from http import HTTPStatus
+
 from django.test import Client, TestCase
 from django.urls import reverse
 from posts.models import Comment, Post, User
+from posts.pagination import COMMENTS_PER_PAGE
 
 
 class TestComments(TestCase):
@@ -59,3 +62,42 @@ class TestComments(TestCase):
             response.context['post'].comments.all()[0].text,
             self.TEST_COMMENT_TEXT
         )
+
+    def test_comments_paginated_by_cursor(self):
+        """
+        На странице поста выводится первая страница комментариев,
+        остальные подгружаются по курсору фрагментами и в JSON.
+        """
+        Comment.objects.bulk_create(
+            Comment(post=self.post, author=self.author, text=f'Текст {index}')
+            for index in range(COMMENTS_PER_PAGE + 5)
+        )
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        )
+        self.assertEqual(len(response.context['comments']), COMMENTS_PER_PAGE)
+        cursor = response.context['next_cursor']
+        url = reverse('posts:post_comments', kwargs={'post_id': self.post.id})
+        response = self.guest_client.get(url, {'after': cursor})
+        self.assertEqual(len(response.context['comments']), 5)
+        self.assertEqual(response['X-Next-Cursor'], '')
+        response = self.guest_client.get(
+            url, {'after': cursor, 'format': 'json'}
+        )
+        data = response.json()
+        self.assertEqual(
+            [comment['text'] for comment in data['comments']],
+            [
+                f'Текст {index}'
+                for index in range(COMMENTS_PER_PAGE, COMMENTS_PER_PAGE + 5)
+            ]
+        )
+        self.assertIsNone(data['next'])
+
+    def test_invalid_cursor(self):
+        """Испорченный курсор даёт ошибку 400."""
+        response = self.guest_client.get(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.id}),
+            {'after': 'broken'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from core.shared_cache import get_generation, shared_cache
+from posts.follow_graph import (
+    FOLLOWEES_GENERATION_KEY, FOLLOWEES_KEY, follow, get_followees,
+    is_following
+)
+from posts.models import Follow, User
+
+
+class TestFollowGraph(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.authors = [
+            User.objects.create_user(username=f'author{index}')
+            for index in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        shared_cache().clear()
+        # TestCase не фиксирует транзакцию, сброс кеша выполняется сразу
+        patcher = mock.patch.object(
+            transaction, 'on_commit', lambda func: func()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_followees_cached(self):
+        """Повторная проверка подписки не обращается к БД."""
+        Follow.objects.create(user=self.user, author=self.authors[1])
+        self.assertTrue(is_following(self.user.pk, self.authors[1].pk))
+        with self.assertNumQueries(0):
+            self.assertTrue(is_following(self.user.pk, self.authors[1].pk))
+            self.assertFalse(is_following(self.user.pk, self.authors[0].pk))
+
+    def test_followees_invalidated_on_follow_and_unfollow(self):
+        """Кеш подписок сбрасывается при подписке и отписке."""
+        self.assertEqual(list(get_followees(self.user.pk)), [])
+        follows = [
+            Follow.objects.create(user=self.user, author=author)
+            for author in reversed(self.authors)
+        ]
+        self.assertEqual(
+            list(get_followees(self.user.pk)),
+            sorted(author.pk for author in self.authors)
+        )
+        follows[0].delete()
+        self.assertFalse(is_following(self.user.pk, self.authors[-1].pk))
+
+    def test_late_write_of_stale_set_ignored(self):
+        """Запоздалая запись старого набора не перекрывает подписку."""
+        stale_key = FOLLOWEES_KEY.format(
+            self.user.pk,
+            get_generation(FOLLOWEES_GENERATION_KEY.format(self.user.pk))
+        )
+        follow(self.user.pk, self.authors[0].pk)
+        shared_cache().add(stale_key, b'')
+        self.assertTrue(is_following(self.user.pk, self.authors[0].pk))
+
+
+class TestFollowGraphCommit(TransactionTestCase):
+    def setUp(self):
+        shared_cache().clear()
+        self.user, self.author = (
+            User.objects.create_user(username=username)
+            for username in ('TestUser', 'author')
+        )
+
+    def test_followees_invalidated_after_commit(self):
+        """Кеш подписок сбрасывается только после фиксации транзакции."""
+        self.assertEqual(list(get_followees(self.user.pk)), [])
+        with transaction.atomic():
+            follow(self.user.pk, self.author.pk)
+            self.assertEqual(list(get_followees(self.user.pk)), [])
+        self.assertTrue(is_following(self.user.pk, self.author.pk))
+
+    def test_rolled_back_follow_keeps_cache(self):
+        """Откаченная подписка не сбрасывает кеш."""
+        get_followees(self.user.pk)
+        generation = get_generation(
+            FOLLOWEES_GENERATION_KEY.format(self.user.pk)
+        )
+        with transaction.atomic():
+            follow(self.user.pk, self.author.pk)
+            transaction.set_rollback(True)
+        self.assertEqual(
+            get_generation(FOLLOWEES_GENERATION_KEY.format(self.user.pk)),
+            generation
+        )
+        self.assertFalse(is_following(self.user.pk, self.author.pk))
@@ -1,3 +1,5 @@
+from http import HTTPStatus
+
 from django.test import Client, TestCase
 from django.urls import reverse, reverse_lazy
 from posts.models import Follow, Post, User
@@ -25,6 +27,14 @@ class TestFollow(TestCase):
             'posts:profile_unfollow',
             kwargs={'username': cls.author.username}
         )
+        cls.url_follow_json = reverse_lazy(
+            'posts:profile_follow_json',
+            kwargs={'username': cls.author.username}
+        )
+        cls.url_unfollow_json = reverse_lazy(
+            'posts:profile_unfollow_json',
+            kwargs={'username': cls.author.username}
+        )
 
     def setUp(self):
         self.guest_client = Client()
@@ -79,3 +89,29 @@ class TestFollow(TestCase):
         self.assertEqual(posts_count(self.user), count + 1)
         # проверяем ленту другого пользователя
         self.assertEqual(posts_count(self.user1), count1)
+
+    def test_follow_json_is_idempotent(self):
+        """
+        Повторная подписка через JSON не создаёт дубликат и не падает,
+        ответ содержит новое состояние и число подписчиков.
+        """
+        for _ in range(2):
+            response = self.authorized_client.post(self.url_follow_json)
+            self.assertEqual(
+                response.json(), {'following': True, 'followers': 1}
+            )
+        self.assertEqual(Follow.objects.filter(author=self.author).count(), 1)
+        for _ in range(2):
+            response = self.authorized_client.post(self.url_unfollow_json)
+            self.assertEqual(
+                response.json(), {'following': False, 'followers': 0}
+            )
+
+    def test_follow_json_requires_post_and_login(self):
+        """JSON-подписка доступна только авторизованным и только POST."""
+        response = self.guest_client.post(self.url_follow_json)
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+        response = self.authorized_client.get(self.url_follow_json)
+        self.assertEqual(
+            response.status_code, HTTPStatus.METHOD_NOT_ALLOWED
+        )
@@ -0,0 +1,120 @@
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Comment, Group, Post, PostScore, User
+from posts.moderation import posts_batch_changed
+
+
+class TestModeration(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@test.tt', password='password'
+        )
+        cls.author = User.objects.create_user(username='spammer')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.new_group = Group.objects.create(
+            title='Новая группа',
+            slug='new-slug',
+            description='Новое описание',
+        )
+
+    def setUp(self):
+        self.posts = [
+            Post.objects.create(
+                text='Спам', author=self.author, group=self.group
+            )
+            for _ in range(5)
+        ]
+        for post in self.posts:
+            Comment.objects.create(text='Спам', author=self.author, post=post)
+        self.batches = []
+        posts_batch_changed.connect(self.on_batch)
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def tearDown(self):
+        posts_batch_changed.disconnect(self.on_batch)
+
+    def on_batch(self, sender, pks, deleted, **kwargs):
+        self.batches.append((pks, deleted))
+
+    def test_command_moves_posts_in_batches(self):
+        """Команда переносит посты в группу пачками."""
+        call_command(
+            'moderate_posts', '--group=test-slug', '--move-to=new-slug',
+            '--batch-size=2'
+        )
+        self.assertEqual(
+            Post.objects.filter(group=self.new_group).count(), 5
+        )
+        self.assertEqual([len(pks) for pks, _ in self.batches], [2, 2, 1])
+
+    def test_command_deletes_posts_with_comments(self):
+        """Команда удаляет посты автора вместе с комментариями."""
+        call_command(
+            'moderate_posts', '--author=spammer', '--delete', '--batch-size=2'
+        )
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertTrue(all(deleted for _, deleted in self.batches))
+
+    def test_delete_cascades_with_signals(self):
+        """
+        Пачка удаляется каскадом Django: post_delete отправляется на каждый
+        пост, а DELETE остаётся один на таблицу.
+        """
+        PostScore.objects.create(post=self.posts[0], score=1)
+        deleted_posts = []
+
+        def on_delete(sender, instance, **kwargs):
+            deleted_posts.append(instance.pk)
+
+        post_delete.connect(on_delete, sender=Post)
+        try:
+            with CaptureQueriesContext(connection) as context:
+                call_command('moderate_posts', '--author=spammer', '--delete')
+        finally:
+            post_delete.disconnect(on_delete, sender=Post)
+        deletes = [
+            query['sql'] for query in context
+            if query['sql'].startswith('DELETE')
+        ]
+        # комментарии, рейтинги и посты — по одному DELETE на пачку
+        self.assertEqual(len(deletes), 3)
+        self.assertCountEqual(
+            deleted_posts, [post.pk for post in self.posts]
+        )
+        self.assertFalse(PostScore.objects.exists())
+        self.assertEqual(len(self.batches), 1)
+
+    def test_admin_move_to_group_action(self):
+        """Действие админки переносит выбранные посты в группу."""
+        selected = [post.pk for post in self.posts[:3]]
+        url = reverse('admin:posts_post_changelist')
+        data = {
+            'action': 'move_to_group_action',
+            ACTION_CHECKBOX_NAME: selected,
+        }
+        response = self.admin_client.post(url, data)
+        self.assertTemplateUsed(
+            response, 'admin/posts/post/move_to_group.html'
+        )
+        data.update(apply='1', group=self.new_group.pk)
+        self.admin_client.post(url, data)
+        self.assertEqual(
+            set(
+                Post.objects.filter(group=self.new_group)
+                .values_list('pk', flat=True)
+            ),
+            set(selected)
+        )
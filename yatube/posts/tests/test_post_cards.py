@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Comment, Group, Post, User
+
+
+class TestPostCards(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='author.name'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.author,
+            group=cls.group
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        cache.clear()
+
+    def test_card_urls_match_reverse(self):
+        """Ссылки карточки совпадают с результатом reverse()."""
+        content = self.guest_client.get(reverse('posts:index')).content
+        urls = [
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertIn(f'href="{url}"'.encode(), content)
+
+    def test_card_edit_links_only_for_author(self):
+        """Ссылки редактирования и удаления видит только автор."""
+        edit_url = reverse('posts:post_edit', args=[self.post.pk])
+        content = self.guest_client.get(reverse('posts:index')).content
+        self.assertNotIn(edit_url.encode(), content)
+        content = self.author_client.get(reverse('posts:index')).content
+        self.assertIn(edit_url.encode(), content)
+
+    def test_comment_count_without_join(self):
+        """Комментарии считаются для постов страницы, без JOIN в ленте."""
+        Comment.objects.create(
+            text='Комментарий', author=self.author, post=self.post
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(response.context['page_obj'][0].comment_count, 1)
+        for query in context:
+            if 'FROM "posts_post"' in query['sql']:
+                with self.subTest(sql=query['sql']):
+                    self.assertNotIn('posts_comment', query['sql'])
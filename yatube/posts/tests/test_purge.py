@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Comment, Follow, Post, User, UserPurge
+from posts.purge import schedule_user_deletion
+
+
+class TestPurge(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        self.post = Post.objects.create(
+            text='Тестовый пост', author=self.author
+        )
+        for _ in range(3):
+            Comment.objects.create(
+                text='Комментарий', author=self.reader, post=self.post
+            )
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_deleted_post_hidden_then_purged(self):
+        """Удалённый пост сразу скрыт, а затем очищается в фоне."""
+        self.author_client.get(
+            reverse('posts:post_delete', args=[self.post.pk])
+        )
+        response = self.author_client.get(reverse('posts:index'))
+        self.assertNotIn(self.post, response.context['page_obj'])
+        response = self.author_client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertEqual(Comment.objects.count(), 3)
+        call_command('purge_deleted', batch_size=2, pause=0)
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Comment.objects.exists())
+
+    def test_deleted_user_hidden_then_purged(self):
+        """Посты удалённого пользователя скрыты до фоновой очистки."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        schedule_user_deletion(self.author.pk)
+        response = self.author_client.get(reverse('posts:index'))
+        self.assertNotIn(self.post, response.context['page_obj'])
+        call_command('purge_deleted', batch_size=2, pause=0)
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(UserPurge.objects.exists())
+        self.assertTrue(User.objects.filter(pk=self.reader.pk).exists())
@@ -0,0 +1,129 @@
+from unittest import mock
+
+from core.shared_cache import shared_cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts import recommendations
+from posts.follow_graph import follow
+from posts.models import Follow, Recommendation, RecommendationRefresh, User
+from posts.recommendations import (followers_of, mark_stale,
+                                   recommended_authors, refresh_stale)
+
+
+class TestRecommendations(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user, cls.friend, cls.author, cls.other = (
+            User.objects.create_user(username=username)
+            for username in ('user', 'friend', 'author', 'other')
+        )
+
+    def setUp(self):
+        shared_cache().clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_friend_of_friend_recommended(self):
+        """Рекомендуются подписки подписок, но не уже отслеживаемые."""
+        Follow.objects.create(user=self.user, author=self.friend)
+        Follow.objects.create(user=self.friend, author=self.author)
+        call_command('compute_recommendations')
+        self.assertEqual(recommended_authors(self.user), [self.author])
+        self.assertFalse(RecommendationRefresh.objects.exists())
+
+    def test_recomputed_incrementally_after_follow(self):
+        """После подписки пересчитываются только затронутые пользователи."""
+        Follow.objects.create(user=self.user, author=self.friend)
+        call_command('compute_recommendations', '--full')
+        self.assertEqual(recommended_authors(self.user), [])
+        Follow.objects.create(user=self.friend, author=self.author)
+        call_command('compute_recommendations')
+        self.assertEqual(recommended_authors(self.user), [self.author])
+        self.assertFalse(
+            Recommendation.objects.filter(user=self.other).exists()
+        )
+
+    def test_inactive_author_not_recommended(self):
+        """Отключённые авторы не рекомендуются ни при расчёте, ни после."""
+        Follow.objects.create(user=self.user, author=self.friend)
+        Follow.objects.create(user=self.friend, author=self.author)
+        Follow.objects.create(user=self.friend, author=self.other)
+        User.objects.filter(pk=self.other.pk).update(is_active=False)
+        call_command('compute_recommendations')
+        self.assertEqual(recommended_authors(self.user), [self.author])
+        User.objects.filter(pk=self.author.pk).update(is_active=False)
+        self.assertEqual(recommended_authors(self.user), [])
+
+    @mock.patch.object(recommendations, 'CO_FOLLOWERS_PER_CHUNK', 3)
+    def test_co_followers_capped_per_chunk(self):
+        """Совместные подписки берутся не больше чем от лимита на пачку."""
+        authors = [self.friend, self.author, self.other]
+        for number in range(4):
+            follower = User.objects.create_user(username=f'follower{number}')
+            for author in authors:
+                Follow.objects.create(user=follower, author=author)
+        for author in authors:
+            Follow.objects.create(user=self.user, author=author)
+        with mock.patch.object(
+            recommendations, 'followers_of', wraps=followers_of
+        ) as sampled:
+            recommendations.compute_chunk([self.user.pk])
+        (author_ids, sample), _ = sampled.call_args
+        self.assertLessEqual(len(author_ids) * sample, 3)
+
+    def test_sidebar_on_follow_index(self):
+        """Рекомендации выводятся на странице подписок."""
+        Recommendation.objects.create(
+            user=self.user, author=self.other, score=1
+        )
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.context['recommended'], [self.other])
+
+    def test_followed_author_not_recommended(self):
+        """Автор пропадает из рекомендаций сразу после подписки."""
+        Recommendation.objects.create(
+            user=self.user, author=self.author, score=2
+        )
+        Recommendation.objects.create(
+            user=self.user, author=self.other, score=1
+        )
+        follow(self.user.pk, self.author.pk)
+        self.assertEqual(recommended_authors(self.user), [self.other])
+
+    def test_followers_sampled_in_sql(self):
+        """Подписчики автора выбираются с LIMIT, последние первыми."""
+        for follower in (self.user, self.friend, self.other):
+            Follow.objects.create(user=follower, author=self.author)
+        Follow.objects.create(user=self.user, author=self.friend)
+        followers = followers_of([self.author.pk, self.friend.pk], sample=2)
+        self.assertEqual(
+            followers[self.author.pk], [self.other.pk, self.friend.pk]
+        )
+        self.assertEqual(followers[self.friend.pk], [self.user.pk])
+
+    def test_mark_kept_if_follows_changed_during_refresh(self):
+        """
+        Отметка снимается только после записи рекомендаций и остаётся,
+        если подписки изменились во время пересчёта.
+        """
+        mark_stale(self.user.pk)
+        mark_stale(self.friend.pk)
+        store_chunk = recommendations.store_chunk
+
+        def store_and_follow(chunk):
+            self.assertEqual(RecommendationRefresh.objects.count(), 2)
+            store_chunk(chunk)
+            mark_stale(self.user.pk)
+
+        with mock.patch.object(
+            recommendations, 'store_chunk', store_and_follow
+        ):
+            refresh_stale()
+        self.assertEqual(
+            list(RecommendationRefresh.objects.values_list(
+                'user_id', flat=True
+            )),
+            [self.user.pk]
+        )
@@ -0,0 +1,85 @@
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Group, GroupScore, Post, PostScore, User
+from posts.trending import PopularPosts
+from posts.warmup import top_authors
+
+
+class TestTrending(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def create_post(self, text):
+        self.client.post(
+            reverse('posts:post_create'),
+            data={'text': text, 'group': self.group.pk}
+        )
+        return Post.objects.get(text=text)
+
+    def test_comments_raise_post_in_popular_feed(self):
+        """Пост с комментариями поднимается в популярном."""
+        quiet = self.create_post('Тихий пост')
+        discussed = self.create_post('Обсуждаемый пост')
+        for _ in range(2):
+            self.client.post(
+                reverse('posts:add_comment', args=[discussed.pk]),
+                data={'text': 'Комментарий'}
+            )
+        response = self.client.get(reverse('posts:popular'))
+        self.assertEqual(
+            list(response.context['page_obj']), [discussed, quiet]
+        )
+        self.assertEqual(response.context['groups'], [self.group])
+        self.assertEqual(GroupScore.objects.get().score, 4)
+
+    def test_popular_posts_read_from_scores(self):
+        """
+        Популярное читается от рейтингов одним запросом вместе с авторами
+        и группами, без скрытых постов.
+        """
+        shown = self.create_post('Видимый пост')
+        hidden = self.create_post('Скрытый пост')
+        hidden.is_hidden = True
+        hidden.save()
+        with self.assertNumQueries(1):
+            posts = PopularPosts()[0:10]
+            self.assertEqual(
+                [(post, post.author, post.group) for post in posts],
+                [(shown, self.author, self.group)]
+            )
+        self.assertEqual(PopularPosts().count(), 1)
+
+    def test_decay_halves_scores_and_prunes(self):
+        """Затухание уменьшает рейтинги и удаляет малые."""
+        post = self.create_post('Пост')
+        call_command('decay_trending', hours=6, half_life=6)
+        self.assertAlmostEqual(PostScore.objects.get(post=post).score, 0.5)
+        call_command('decay_trending', hours=60, half_life=6)
+        self.assertFalse(PostScore.objects.exists())
+
+    def test_warmup_top_authors_from_scores(self):
+        """Прогрев берёт авторов популярных видимых постов без повторов."""
+        other = User.objects.create_user(username='other')
+        hidden = User.objects.create_user(username='hidden')
+        for author, score in ((self.author, 3), (other, 2), (hidden, 5)):
+            for text in ('Первый', 'Второй'):
+                post = Post.objects.create(text=text, author=author)
+                PostScore.objects.update_or_create(
+                    post=post, defaults={'score': score}
+                )
+        Post.objects.filter(author=hidden).update(is_hidden=True)
+        with self.assertNumQueries(1):
+            self.assertEqual(top_authors(10), ['author', 'other'])
+        self.assertEqual(top_authors(1), ['author'])
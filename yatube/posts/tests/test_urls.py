@@ -1,5 +1,6 @@
 from http import HTTPStatus
 
+from django.core.cache import cache
 from django.test import Client, TestCase
 from posts.models import Group, Post, User
 
@@ -31,6 +32,9 @@ class TestPostsURLs(TestCase):
         cls.unexisting_page = '/unexisting_page/'
 
     def setUp(self):
+        # ленты кешируются целиком, а шаблоны и контекст есть только
+        # у отрендеренного ответа
+        cache.clear()
         self.guest_client = Client()
         self.user = User.objects.create_user(username='TestUser')
         self.authorized_client = Client()
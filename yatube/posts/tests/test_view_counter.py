@@ -0,0 +1,98 @@
+import time
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import reverse
+from posts import view_counter as counter_module
+from posts.models import Post, User
+from posts.view_counter import ViewCounter, view_counter
+
+
+class TestViewCounter(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.posts = [
+            Post.objects.create(text=f'Пост {number}', author=cls.author)
+            for number in range(2)
+        ]
+
+    def setUp(self):
+        # просмотры других тестов не должны попасть в этот
+        view_counter.reset()
+
+    def tearDown(self):
+        view_counter.reset()
+
+    def views(self):
+        return list(
+            Post.objects.order_by('pk').values_list('views', flat=True)
+        )
+
+    def test_views_buffered_until_threshold(self):
+        """Просмотры копятся в памяти и записываются одним запросом."""
+        counter = ViewCounter(flush_interval=60, flush_every=5)
+        first, second = self.posts
+        for post in (first, first, second, first):
+            counter.increment(post.pk)
+        self.assertEqual(self.views(), [0, 0])
+        with self.assertNumQueries(3):
+            counter.increment(second.pk)
+        self.assertEqual(self.views(), [3, 2])
+
+    def test_views_flushed_by_interval(self):
+        """Просмотры записываются, когда истекает интервал."""
+        counter = ViewCounter(flush_interval=60, flush_every=100)
+        counter.increment(self.posts[0].pk)
+        counter.last_flush -= 60
+        counter.increment(self.posts[0].pk)
+        self.assertEqual(self.views(), [2, 0])
+
+    def test_post_detail_shows_views(self):
+        """Страница поста учитывает и показывает просмотры."""
+        url = reverse('posts:post_detail', args=[self.posts[0].pk])
+        Client().get(url)
+        response = Client().get(url)
+        self.assertEqual(response.context['view_count'], 2)
+
+    @override_settings(VIEW_COUNTER_FLUSH_EVERY=100)
+    def test_views_flushed_at_end_of_request(self):
+        """По истечении интервала буфер пишется в конце любого запроса."""
+        url = reverse('posts:post_detail', args=[self.posts[0].pk])
+        Client().get(url)
+        self.assertEqual(self.views(), [0, 0])
+        view_counter.last_flush -= 3600
+        Client().get(reverse('posts:index'))
+        self.assertEqual(self.views(), [1, 0])
+
+    def test_failed_flush_keeps_views(self):
+        """Ошибка записи логируется, просмотры остаются в буфере."""
+        counter = ViewCounter(flush_interval=60, flush_every=100)
+        counter.increment(self.posts[0].pk)
+        with mock.patch.object(
+            counter_module, 'write_views', side_effect=DatabaseError
+        ):
+            with self.assertLogs('yatube.view_counter', 'ERROR'):
+                self.assertFalse(counter.flush())
+        self.assertEqual(counter.pending[self.posts[0].pk], 1)
+        self.assertTrue(counter.flush())
+        self.assertEqual(self.views(), [1, 0])
+
+
+class TestViewCounterTimer(TransactionTestCase):
+    def test_idle_worker_flushes_on_timer(self):
+        """Без новых запросов буфер записывает фоновый поток."""
+        post = Post.objects.create(
+            text='Пост', author=User.objects.create_user(username='author')
+        )
+        counter = ViewCounter(flush_interval=0.05, flush_every=100)
+        counter.increment(post.pk)
+        deadline = time.monotonic() + 5
+        while post.views == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+            post.refresh_from_db()
+        self.assertEqual(post.views, 1)
@@ -0,0 +1,83 @@
+from django.db import transaction
+from django.db.models import F
+
+from .models import GroupScore, PostScore
+
+NEW_POST_WEIGHT = 1.0
+COMMENT_WEIGHT = 1.0
+# через сколько часов вклад активности уменьшается вдвое
+HALF_LIFE_HOURS = 6
+# рейтинги ниже порога удаляются, чтобы таблицы оставались маленькими
+MIN_SCORE = 0.01
+TRENDING_GROUPS = 10
+
+
+def bump(model, key, pk, weight):
+    """Увеличивает рейтинг одним UPDATE, создавая строку при отсутствии."""
+    with transaction.atomic():
+        updated = model.objects.filter(pk=pk).update(
+            score=F('score') + weight
+        )
+        if not updated:
+            model.objects.bulk_create(
+                [model(**{key: pk, 'score': weight})], ignore_conflicts=True
+            )
+
+
+def post_activity(post, weight):
+    bump(PostScore, 'post_id', post.pk, weight)
+    if post.group_id is not None:
+        bump(GroupScore, 'group_id', post.group_id, weight)
+
+
+def post_created(post):
+    post_activity(post, NEW_POST_WEIGHT)
+
+
+def comment_added(comment):
+    post_activity(comment.post, COMMENT_WEIGHT)
+
+
+def decay(hours, half_life=HALF_LIFE_HOURS):
+    """Применяет затухание за прошедшие часы и удаляет малые рейтинги."""
+    factor = 0.5 ** (hours / half_life)
+    for model in (PostScore, GroupScore):
+        with transaction.atomic():
+            model.objects.update(score=F('score') * factor)
+            model.objects.filter(score__lt=MIN_SCORE).delete()
+    return factor
+
+
+class PopularPosts:
+    """
+    Популярные посты для Paginator: запрос идёт от PostScore по индексу
+    -score, а посты с авторами и группами подтягиваются JOIN-ом.
+    """
+    ordered = True
+
+    def __init__(self):
+        self.scores = PostScore.objects.filter(
+            post__is_hidden=False, post__author__is_active=True
+        ).select_related('post__author', 'post__group').order_by(
+            '-score', '-post__pub_date'
+        )
+
+    def count(self):
+        return self.scores.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        return [score.post for score in self.scores[index]]
+
+
+def trending_groups(limit=TRENDING_GROUPS):
+    return [
+        score.group
+        for score in GroupScore.objects.select_related('group').order_by(
+            '-score'
+        )[:limit]
+    ]
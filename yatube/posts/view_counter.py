@@ -0,0 +1,144 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import connections, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from core.write_queue import run_write
+
+from .models import Post
+
+logger = logging.getLogger('yatube.view_counter')
+
+
+def write_views(counts):
+    """Прибавляет просмотры всех постов пачки одним UPDATE."""
+    Post.objects.filter(pk__in=list(counts)).update(
+        views=F('views') + Case(
+            *(When(pk=pk, then=Value(count)) for pk, count in counts.items()),
+            default=Value(0),
+            output_field=IntegerField()
+        )
+    )
+
+
+class ViewCounter:
+    """
+    Буфер просмотров постов в памяти процесса.
+
+    Просмотры суммируются по постам и записываются одной транзакцией
+    после flush_every просмотров, а также фоновым потоком процесса и
+    в конце любого запроса каждые flush_interval секунд (по умолчанию из
+    настроек) и при штатной остановке процесса. Неудачная запись остаётся
+    в буфере до следующей попытки. При падении теряется не больше одного
+    окна.
+    """
+
+    def __init__(self, flush_interval=None, flush_every=None):
+        self.flush_interval = flush_interval
+        self.flush_every = flush_every
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.buffered = 0
+        self.last_flush = time.monotonic()
+        self.pid = None
+
+    def reset(self):
+        with self.lock:
+            self.pending = Counter()
+            self.buffered = 0
+
+    def increment(self, post_id):
+        """
+        Учитывает просмотр. Возвращает просмотры поста, не попавшие
+        в базу до этого вызова, включая текущий.
+        """
+        self.start_flusher()
+        with self.lock:
+            self.pending[post_id] += 1
+            self.buffered += 1
+            unsaved = self.pending[post_id]
+            due = self.buffered >= (
+                self.flush_every or settings.VIEW_COUNTER_FLUSH_EVERY
+            ) or self.interval_elapsed()
+        if due:
+            self.flush()
+        return unsaved
+
+    def start_flusher(self):
+        """
+        Запускает в процессе поток, записывающий буфер по таймеру: иначе
+        просмотры простаивающего воркера так и остались бы в памяти.
+        """
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            if self.pid is not None:
+                # после fork просмотры из буфера запишет родитель
+                self.pending = Counter()
+                self.buffered = 0
+            self.pid = os.getpid()
+        threading.Thread(
+            target=self.flush_forever, name='view-counter', daemon=True
+        ).start()
+
+    def flush_forever(self):
+        while True:
+            time.sleep(
+                self.flush_interval or settings.VIEW_COUNTER_FLUSH_INTERVAL
+            )
+            if self.pending and self.interval_elapsed():
+                self.flush()
+                connections.close_all()
+
+    def interval_elapsed(self):
+        return time.monotonic() - self.last_flush >= (
+            self.flush_interval or settings.VIEW_COUNTER_FLUSH_INTERVAL
+        )
+
+    def flush_if_due(self, **kwargs):
+        """Запись по таймеру в конце запроса, см. request_finished."""
+        if self.pending and self.interval_elapsed():
+            self.flush()
+
+    def flush(self, queued=True):
+        """
+        Записывает буфер; True, если записывать было нечего или запись
+        удалась. Ошибка логируется, а просмотры остаются в буфере.
+        """
+        with self.lock:
+            counts, self.pending = self.pending, Counter()
+            self.buffered = 0
+            self.last_flush = time.monotonic()
+        if not counts:
+            return True
+        try:
+            if queued:
+                run_write(write_views, counts)
+            else:
+                with transaction.atomic():
+                    write_views(counts)
+        except Exception:
+            logger.exception('Просмотры не записаны, оставлены в буфере')
+            with self.lock:
+                self.pending.update(counts)
+                self.buffered += sum(counts.values())
+            return False
+        return True
+
+    def flush_at_exit(self):
+        # поток писателя при выходе может уже не работать
+        self.flush(queued=False)
+
+
+view_counter = ViewCounter()
+request_finished.connect(view_counter.flush_if_due)
+atexit.register(view_counter.flush_at_exit)
@@ -1,19 +1,69 @@
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.db.models import Prefetch
+from django.http import Http404, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import require_POST
 
+from core.page_cache import cache_shared_page
+from core.write_queue import WriteTimeout, run_write
+from posts.archive import (
+    ALL_SCOPE, TieredPosts, archived_count, archived_posts
+)
+from posts.follow_graph import (
+    FOLLOWEES_IN_LIMIT, follow, get_followees, unfollow
+)
 from posts.forms import CommentForm, PostForm
-from posts.models import Comment, Follow, Group, Post, User
+from posts.models import Comment, Group, Post, User
+from posts.pagination import FeedPaginator, comments_page
+from posts.purge import hide_post
+from posts.routers import ARCHIVE_DB
+from posts.trending import (
+    PopularPosts, comment_added, post_created, trending_groups
+)
+from posts.view_counter import view_counter
 
 POSTS_PER_PAGE = 10
 
 
+def feed_posts():
+    """
+    Посты для ленты с авторами и группами. Число комментариев проставляет
+    FeedPaginator только постам страницы.
+    """
+    return Post.objects.visible().select_related('author', 'group').order_by(
+        '-pub_date'
+    )
+
+
+def feed_page(request, scope, **filters):
+    """
+    Страница ленты: свежие посты основной базы, а при листании дальше
+    них — посты архива.
+    """
+    post_list = feed_posts().filter(**filters)
+    cold_count = archived_count(scope)
+    if cold_count:
+        post_list = TieredPosts(
+            post_list, archived_posts().filter(**filters), cold_count
+        )
+    paginator = FeedPaginator(post_list, POSTS_PER_PAGE)
+    return paginator.get_page(request.GET.get('page'))
+
+
+def get_post_or_404(post_id):
+    """Пост из основной базы, а если его там нет — из архива."""
+    post = Post.objects.visible().select_related('group', 'author').filter(
+        pk=post_id
+    ).first()
+    if post is None and archived_count(ALL_SCOPE):
+        post = archived_posts().filter(pk=post_id).first()
+    if post is None:
+        raise Http404
+    return post
+
+
+@cache_shared_page()
 def index(request):
-    post_list = Post.objects.select_related('author', 'group').all()
-    paginator = Paginator(post_list, POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = feed_page(request, ALL_SCOPE)
     template = 'posts/index.html'
     context = {
         'page_obj': page_obj,
@@ -21,17 +71,22 @@ def index(request):
     return render(request, template, context)
 
 
-def group_posts(request, slug):
-    group = get_object_or_404(
-        Group.objects.prefetch_related(
-            Prefetch('posts', queryset=Post.objects.select_related('author'))
-        ),
-        slug=slug
-    )
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, POSTS_PER_PAGE)
+def popular(request):
+    paginator = FeedPaginator(PopularPosts(), POSTS_PER_PAGE)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    template = 'posts/popular.html'
+    context = {
+        'page_obj': page_obj,
+        'groups': trending_groups(),
+    }
+    return render(request, template, context)
+
+
+@cache_shared_page()
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    page_obj = feed_page(request, f'group:{group.pk}', group=group)
     template = 'posts/group_list.html'
     context = {
         'group': group,
@@ -40,47 +95,71 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+@cache_shared_page()
 def profile(request, username):
-    author = get_object_or_404(
-        User.objects.prefetch_related(
-            Prefetch('post_set', queryset=Post.objects.select_related('group'))
-        ),
-        username=username
-    )
-    post_list = author.post_set.all()
-    paginator = Paginator(post_list, POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    following = request.user.is_authenticated
-    if following:
-        following = Follow.objects.filter(
-            user=request.user, author=author
-        ).exists()
+    author = get_object_or_404(User, username=username, is_active=True)
+    page_obj = feed_page(request, f'author:{author.pk}', author=author)
     template = 'posts/profile.html'
     context = {
         'author': author,
         'page_obj': page_obj,
-        'following': following
     }
     return render(request, template, context)
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(
-        Post.objects.select_related('group', 'author').prefetch_related(
-            'comments__author', 'author__post_set'
-        ),
-        pk=post_id
-    )
+    post = get_post_or_404(post_id)
+    # архивные посты только для чтения, просмотры в них не считаются
+    archived = post._state.db == ARCHIVE_DB
+    view_count = post.views
+    if not archived:
+        view_count += view_counter.increment(post.pk)
+    comments, next_cursor = comments_page(post.pk, using=post._state.db)
     form = CommentForm(request.POST or None)
     template = 'posts/post_detail.html'
     context = {
         'post': post,
+        'archived': archived,
+        'view_count': view_count,
         'form': form,
+        'comments': comments,
+        'comment_count': post.comments.count(),
+        'next_cursor': next_cursor,
     }
     return render(request, template, context)
 
 
+def post_comments(request, post_id):
+    """Следующая страница комментариев: HTML-фрагмент или JSON."""
+    post = get_post_or_404(post_id)
+    try:
+        comments, next_cursor = comments_page(
+            post.pk, request.GET.get('after'), using=post._state.db
+        )
+    except ValueError:
+        return HttpResponseBadRequest('Неверный курсор')
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.pk,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created': comment.created.isoformat(),
+                }
+                for comment in comments
+            ],
+            'next': next_cursor,
+        })
+    response = render(
+        request,
+        'posts/includes/comment_list.html',
+        {'comments': comments}
+    )
+    response['X-Next-Cursor'] = next_cursor or ''
+    return response
+
+
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
@@ -90,12 +169,13 @@ def post_create(request):
     post = form.save(commit=False)
     post.author = request.user
     post.save()
+    post_created(post)
     return redirect('posts:profile', username=post.author)
 
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.visible(), pk=post_id)
     if post.author != request.user:
         return redirect('posts:post_detail', post_id=post.id)
     form = PostForm(
@@ -112,29 +192,36 @@ def post_edit(request, post_id):
     if not form.is_valid():
         return render(request, template, context)
     post = form.save(commit=False)
-    post.author = request.user
-    post.save()
+    # счётчик просмотров меняется в фоне, его не перезаписываем
+    post.save(update_fields=PostForm.Meta.fields)
     return redirect('posts:post_detail', post_id=post.id)
 
 
+def save_comment(comment):
+    comment.save()
+    comment_added(comment)
+
+
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.visible(), pk=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        run_write(save_comment, comment)
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
 def follow_index(request):
-    post_list = Post.objects.select_related('author', 'group').filter(
-        author__following__user=request.user
-    )
-    paginator = Paginator(post_list, POSTS_PER_PAGE)
+    followees = get_followees(request.user.pk)
+    if len(followees) > FOLLOWEES_IN_LIMIT:
+        post_list = feed_posts().filter(author__following__user=request.user)
+    else:
+        post_list = feed_posts().filter(author_id__in=list(followees))
+    paginator = FeedPaginator(post_list, POSTS_PER_PAGE)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
@@ -147,26 +234,55 @@ def follow_index(request):
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if not author == request.user:
-        if author.following.filter(user=request.user).count() == 0:
-            author.following.create(user=request.user)
+        run_write(follow, request.user.pk, author.pk)
     return redirect('posts:profile', username=username)
 
 
 @login_required
 def profile_unfollow(request, username):
-    get_object_or_404(
-        Follow.objects.filter(
-            author__username=username, user=request.user
-        ).select_related('author', 'user')
-    ).delete()
+    author = get_object_or_404(User, username=username)
+    run_write(unfollow, request.user.pk, author.pk)
     return redirect('posts:profile', username=username)
 
 
+def follow_state(request, username, subscribe):
+    """Меняет подписку и возвращает её новое состояние в JSON."""
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Требуется авторизация'}, status=403)
+    author = get_object_or_404(User, username=username)
+    if author == request.user:
+        return JsonResponse(
+            {'error': 'Нельзя подписаться на себя'}, status=400
+        )
+    try:
+        run_write(
+            follow if subscribe else unfollow, request.user.pk, author.pk
+        )
+    except WriteTimeout:
+        return JsonResponse(
+            {'error': 'Сервис перегружен, повторите попытку'}, status=503
+        )
+    return JsonResponse({
+        'following': subscribe,
+        'followers': author.following.count(),
+    })
+
+
+@require_POST
+def profile_follow_json(request, username):
+    return follow_state(request, username, subscribe=True)
+
+
+@require_POST
+def profile_unfollow_json(request, username):
+    return follow_state(request, username, subscribe=False)
+
+
 @login_required
 def post_delete(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.visible(), pk=post_id)
     if post.author == request.user:
-        post.delete()
+        hide_post(post.pk)
     return redirect('posts:index')
 
 
@@ -0,0 +1,35 @@
+from django.urls import reverse
+
+from core.warmup import register
+
+from .models import PostScore
+from .trending import trending_groups
+
+
+def top_authors(limit):
+    """
+    Авторы самых обсуждаемых сейчас постов. Читаются из небольшой
+    таблицы рейтингов по индексу -score, а не подсчётом подписчиков
+    GROUP BY по всей таблице подписок.
+    """
+    authors = []
+    for username in PostScore.objects.filter(
+        post__is_hidden=False, post__author__is_active=True
+    ).order_by('-score').values_list(
+        'post__author__username', flat=True
+    ).iterator():
+        if username not in authors:
+            authors.append(username)
+            if len(authors) == limit:
+                break
+    return authors
+
+
+@register
+def pages(limit):
+    """Главная, активные группы и профили авторов популярных постов."""
+    yield reverse('posts:index')
+    for group in trending_groups(limit):
+        yield reverse('posts:group_list', args=[group.slug])
+    for username in top_authors(limit):
+        yield reverse('posts:profile', args=[username])
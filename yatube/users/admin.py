@@ -0,0 +1,31 @@
+from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin
+from posts.models import User
+from posts.purge import schedule_user_deletion
+
+
+class YatubeUserAdmin(UserAdmin):
+    actions = ('schedule_deletion_action',)
+
+    def schedule_deletion_action(self, request, queryset):
+        for user_id in queryset.values_list('pk', flat=True):
+            schedule_user_deletion(user_id)
+        self.message_user(
+            request,
+            'Пользователи отключены, их данные будут удалены в фоне'
+        )
+    schedule_deletion_action.short_description = 'Удалить в фоне'
+
+    def get_actions(self, request):
+        # каскадное удаление всех данных пользователя в одной транзакции
+        # держит блокировку базы, вместо него — удаление в фоне
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def delete_model(self, request, obj):
+        schedule_user_deletion(obj.pk)
+
+
+admin.site.unregister(User)
+admin.site.register(User, YatubeUserAdmin)
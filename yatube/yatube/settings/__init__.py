@@ -0,0 +1,19 @@
+"""
+Профиль настроек выбирается переменной окружения DJANGO_ENV: dev (по
+умолчанию), test или prod, либо модулем профиля в DJANGO_SETTINGS_MODULE,
+например yatube.settings.test в pytest.ini. Загружается только выбранный
+профиль.
+"""
+import os
+
+DJANGO_ENV = os.getenv('DJANGO_ENV', 'dev')
+settings_module = os.getenv('DJANGO_SETTINGS_MODULE', '')
+if settings_module.startswith(__name__ + '.'):
+    DJANGO_ENV = settings_module[len(__name__) + 1:]
+
+if DJANGO_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif DJANGO_ENV == 'test':
+    from .test import *  # noqa: F401,F403
+else:
+    from .dev import *  # noqa: F401,F403
@@ -0,0 +1,262 @@
+"""Общие настройки профилей dev, test и prod."""
+import os
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.getenv('SECRET_KEY')
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = os.getenv('DEBUG') == 'True'
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'posts.apps.PostsConfig',
+    'users',
+    'core.apps.CoreConfig',
+    'about',
+    'api.apps.ApiConfig',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'core.middleware.server_timing.ServerTimingMiddleware',
+    'core.middleware.metrics.MetricsMiddleware',
+    'core.middleware.nplusone.NPlusOneMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.profiling.ProfilingMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    # ниже MessageMiddleware: ответ проходит его позже, и показанные во
+    # фрагменте сообщения успевают отметиться прочитанными
+    'core.middleware.fragments.UserFragmentsMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.write_queue.WriteTimeoutMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    # в production шаблоны компилируются один раз на процесс
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+TEMPLATES = [
+    {
+        'NAME': 'django',
+        'BACKEND': 'core.backends.templates.InstrumentedDjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # держать соединение между запросами, а не открывать заново
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', '600')),
+        'OPTIONS': {
+            'timeout': 5,
+        },
+        # прагмы поверх core.backends.sqlite3.base.DEFAULT_PRAGMAS
+        'PRAGMAS': {},
+        'TRANSACTION_MODE': 'IMMEDIATE',
+    },
+    # старые посты и комментарии, см. posts.archive
+    'archive': {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db-archive.sqlite3'),
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', '600')),
+        'OPTIONS': {
+            'timeout': 5,
+        },
+        # авторы и группы архивных постов лежат в основной базе
+        'PRAGMAS': {
+            'foreign_keys': 'OFF',
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['posts.routers.ArchiveRouter']
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+# сессии и пользователь сессии читаются из базы; из кеша shared их можно
+# брать, только если он общий для всех воркеров, см. settings.prod и
+# core.checks: иначе выход и смена пароля не видны другим процессам
+AUTHENTICATION_BACKENDS = [
+    'django.contrib.auth.backends.ModelBackend',
+]
+SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+SESSION_CACHE_ALIAS = 'shared'
+# сколько секунд пользователь хранится в кеше, см. core.backends.auth
+AUTH_USER_CACHE_TIMEOUT = 5 * 60
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+LOGIN_URL = 'login'
+LOGIN_REDIRECT_URL = 'posts:index'
+# LOGOUT_REDIRECT_URL = 'posts:index'
+
+# подключаем движок filebased.EmailBackend
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# указываем директорию, в которую будут складываться файлы писем
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# подключение бэкенда кеширования
+CACHES = {
+    'default': {
+        'BACKEND': 'core.backends.cache.InstrumentedLocMemCache',
+    },
+    # общий для процессов кеш данных, сбрасываемых при записи, см.
+    # core.shared_cache; с одним процессом достаточно кеша в памяти
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shared',
+    },
+}
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
+
+
+# Заголовок Server-Timing и лог статистики запросов
+SERVER_TIMING = os.getenv('SERVER_TIMING') == 'True'
+# порог медленного запроса в секундах
+SLOW_REQUEST_THRESHOLD = float(os.getenv('SLOW_REQUEST_THRESHOLD', '0.5'))
+
+# Метрики запросов в формате Prometheus
+METRICS_ENABLED = os.getenv('METRICS_ENABLED') == 'True'
+# общий каталог, через который суммируются метрики процессов
+METRICS_DIR = os.getenv('METRICS_DIR', os.path.join(BASE_DIR, 'metrics'))
+# период сброса метрик процесса в файл в секундах
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+# токен сборщика метрик, заголовок Authorization: Bearer <токен>;
+# без него метрики видят только сотрудники
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Очередь единственного писателя для мелких записей
+WRITE_QUEUE_ENABLED = os.getenv('WRITE_QUEUE_ENABLED') == 'True'
+# сколько запрос ждёт свою запись в секундах
+WRITE_QUEUE_TIMEOUT = 10
+
+# Буфер просмотров постов: запись в базу раз в столько секунд
+VIEW_COUNTER_FLUSH_INTERVAL = 5
+# или после стольких просмотров в процессе
+VIEW_COUNTER_FLUSH_EVERY = 500
+
+# Сколько секунд лента отдаётся из кеша, если в ней не появилось
+# постов и комментариев, и в каком кеше она лежит, см. core.page_cache;
+# в одном процессе достаточно кеша default, в prod кеш общий
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', '20'))
+PAGE_CACHE_ALIAS = 'default'
+
+# Прогрев шаблонов, резолверов и страниц при загрузке yatube.wsgi
+# в каждом воркере, см. core.warmup
+WARM_CACHES_ON_START = os.getenv('WARM_CACHES_ON_START') == 'True'
+
+# Каталог копий базы по умолчанию, см. manage.py backup_db
+BACKUP_DIR = os.getenv('BACKUP_DIR', os.path.join(BASE_DIR, 'backups'))
+
+# Профилирование запросов сотрудников и запросов с заголовком X-Profile
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED') == 'True'
+PROFILES_DIR = os.getenv('PROFILES_DIR', os.path.join(BASE_DIR, 'profiles'))
+# срок действия подписанного заголовка X-Profile в секундах
+PROFILE_TOKEN_AGE = 5 * 60
+
+# Поиск N+1 запросов: 'raise' в тестах, 'log' на staging
+NPLUSONE_MODE = os.getenv('NPLUSONE_MODE', '')
+# сколько одинаковых запросов из одного шаблона допустимо за запрос
+NPLUSONE_THRESHOLD = 3
+# таблицы, запросы к которым не считаются: хранилище sorl.thumbnail
+# обращается к БД только при промахе мимо кеша
+NPLUSONE_IGNORE = ('thumbnail_kvstore',)
+
+TEST_RUNNER = 'core.runner.NPlusOneDiscoverRunner'
@@ -0,0 +1,13 @@
+"""Локальная разработка: переменные из .env и debug_toolbar."""
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from .base import *  # noqa: E402,F401,F403
+from .base import INSTALLED_APPS, MIDDLEWARE  # noqa: E402
+
+INSTALLED_APPS = INSTALLED_APPS + ['debug_toolbar']
+MIDDLEWARE = MIDDLEWARE + ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
+# загрузчик app_directories подключён явно в TEMPLATE_LOADERS
+SILENCED_SYSTEM_CHECKS = ['debug_toolbar.W006']
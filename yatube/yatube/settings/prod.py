@@ -0,0 +1,50 @@
+"""
+Production: переменные задаются окружением процесса, .env не читается,
+отладочных приложений нет.
+"""
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import CACHES, DATABASES, TEMPLATES
+
+DEBUG = False
+
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    # шаблоны компилируются один раз на процесс независимо от DEBUG
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATES[0]['OPTIONS']['context_processors'].remove(
+    'django.template.context_processors.debug'
+)
+
+if 'CONN_MAX_AGE' not in os.environ:
+    # соединение с базой живёт всё время работы воркера
+    for database in DATABASES.values():
+        database['CONN_MAX_AGE'] = None
+
+# воркеров несколько, кеш shared должен быть общим: memcached (пакет
+# python-memcached) или таблица в базе, созданная manage.py createcachetable
+if os.getenv('MEMCACHED_LOCATION'):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.getenv('MEMCACHED_LOCATION'),
+    }
+    # сессии и пользователь сессии читаются из memcached, а не запросами
+    # к базе; с кешем в таблице выигрыша нет
+    AUTHENTICATION_BACKENDS = [
+        'core.backends.auth.CachedModelBackend',
+        # для сессий, начатых до включения кеша
+        'django.contrib.auth.backends.ModelBackend',
+    ]
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+else:
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'yatube_cache',
+    }
+
+# страницы, отрисованные одним воркером, отдают все, см. core.page_cache
+PAGE_CACHE_ALIAS = 'shared'
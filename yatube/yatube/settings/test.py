@@ -0,0 +1,29 @@
+"""Тесты: переменные из .env, без отладочных приложений."""
+import atexit
+import shutil
+import tempfile
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from .base import *  # noqa: E402,F401,F403
+from .base import SECRET_KEY  # noqa: E402
+
+# тестам не нужен настоящий ключ, но заданный в окружении не заменяется
+SECRET_KEY = SECRET_KEY or 'yatube-tests-insecure-key'
+
+# N+1 запросы в тестах — ошибка, см. core.middleware.nplusone
+NPLUSONE_MODE = 'raise'
+
+# тесты создают много пользователей, медленный хешер им не нужен
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+# картинки тестовых постов не попадают в media проекта
+MEDIA_ROOT = tempfile.mkdtemp()
+atexit.register(shutil.rmtree, MEDIA_ROOT, ignore_errors=True)
+
+# просмотры пишутся сразу и не остаются в буфере между тестами
+VIEW_COUNTER_FLUSH_EVERY = 1
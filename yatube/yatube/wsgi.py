@@ -3,5 +3,13 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+# WSGI-сервер запускает production-профиль, если не указан другой
+os.environ.setdefault('DJANGO_ENV', 'prod')
 
 application = get_wsgi_application()
+
+# воркер прогревает свои шаблоны и резолверы при загрузке приложения,
+# если WARM_CACHES_ON_START включён, см. core.warmup
+from core.warmup import warm_on_start  # noqa: E402
+
+warm_on_start()